@@ -1,22 +1,197 @@
-# pip install ortools matplotlib streamlit pandas numpy
+# pip install ortools matplotlib streamlit pandas
 import streamlit as st
-import pandas as pd
-import matplotlib.pyplot as plt
-import numpy as np
-from schedule import schedule_modules
+from streamlit.errors import StreamlitAPIException
+# pandas and matplotlib are imported where the comparison charts are drawn, and
+# ortools only when a CP-SAT engine runs, so the first page paints without them
+from schedule import schedule_modules, schedule_strategies, cycle_upper_bound
+from jobs import JobRunner
+from table import load_table, table_result
 import os
+import time
 from itertools import combinations
 
 st.set_page_config(page_title="Enhanced Scheduler", layout="wide")
 
+# each tab reruns on its own when one of its widgets changes (st.fragment needs streamlit >= 1.37)
+fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None) or (lambda f: f)
+
+# the greedy engine handles plants of a few hundred modules within interactive latency
+MAX_MODULES = 500
+
+# when set (e.g. http://127.0.0.1:8765), solves go to the local scheduling service (service.py)
+SCHEDULER_URL = os.environ.get("SCHEDULER_URL")
+
+# precomputed results for common plant configurations (built with python table.py <file>);
+# solves it does not cover run live
+SCHEDULE_TABLE = os.environ.get("SCHEDULE_TABLE",
+                                os.path.join(os.path.dirname(os.path.abspath(__file__)), "schedule_table.bin"))
+
+# analyses run as background jobs; a running job's tab refreshes its progress this often (s)
+JOB_WORKERS = 2
+POLL_INTERVAL = 0.5
+
+def solve_schedule(ads_dur, des_dur, cool_dur, fan_pairs, job=None, instrument=False, progress=None, **kwargs):
+    """
+    schedule_modules() via the scheduling service when SCHEDULER_URL is set, in-process otherwise.
+    Called from a background job: job cancels the in-process solve and collects its stats;
+    progress(fraction, cycles) follows the in-process solve. Configurations in the lookup
+    table are answered from it without solving.
+    """
+    table = schedule_table()
+    if table is not None:
+        result = table_result(table, ads_dur, des_dur, cool_dur, fan_pairs, instrument=instrument, **kwargs)
+        if result is not None:
+            return result["per_module_done"], result["total_done"], None
+    if SCHEDULER_URL:
+        from service import request_schedule
+        scenario = dict(kwargs, ads_dur=ads_dur, des_dur=des_dur, cool_dur=cool_dur,
+                        fan_pairs=[list(p) for p in fan_pairs], render=kwargs.get("render", True),
+                        instrument=instrument)
+        try:
+            line = request_schedule(scenario, SCHEDULER_URL)
+            if line.get("ok"):
+                if job is not None and line.get("stats"):
+                    job.stats.append(line["stats"])
+                return line["per_module_done"], line["total_done"], line.get("png")
+        except Exception:
+            pass  # service down: fall back to solving in-process
+    result = schedule_modules(ads_dur, des_dur, cool_dur, fan_pairs, return_result=True,
+                              instrument=instrument, cancel=job.cancel_event if job is not None else None,
+                              progress=progress, **kwargs)
+    if job is not None and result["stats"]:
+        job.stats.append(result["stats"])
+    return result["per_module_done"], result["total_done"], result["png"]
+
+def schedule_table():
+    """The lookup table if one has been built, else None; mapped once per process"""
+    if SCHEDULE_TABLE and os.path.exists(SCHEDULE_TABLE):
+        try:
+            return load_table(SCHEDULE_TABLE)
+        except ValueError:
+            return None  # stale or foreign file: solve live
+    return None
+
+@st.cache_resource
+def job_runner():
+    """Background executor owned by the app process and shared by every session"""
+    return JobRunner(workers=JOB_WORKERS)
+
+def rerun_tab():
+    """
+    Rerun just the calling tab during a fragment rerun (streamlit >= 1.37), the whole script otherwise.
+    A tab drawn as part of a full-app run (sidebar change, instrument checkbox, ...) cannot rerun
+    on its own: the full rerun is left to rerun_pending() so the remaining tabs still draw first.
+    """
+    if getattr(st, "fragment", None):
+        try:
+            st.rerun(scope="fragment")
+        except StreamlitAPIException:
+            st.session_state["rerun_pending"] = True
+            return
+    st.rerun()
+
+def rerun_pending():
+    """End of the script: the full-app rerun a tab asked for while the whole page was drawing"""
+    if st.session_state.pop("rerun_pending", False):
+        st.rerun()
+
+def start_job(key, params, fn, *args):
+    """Run fn(*args) in the background for the tab inputs params; the tab follows it under session key"""
+    runner = job_runner()
+    saved = st.session_state.get(key)
+    if saved:
+        runner.cancel(saved[1])  # a new run replaces one still going
+    instrument = st.session_state.get("instrument", False)
+    job_id = runner.submit((fn.__name__, repr(args), instrument), fn, *args, instrument=instrument)
+    st.session_state[key] = (params, job_id, None)
+
+def job_result(key, params, label):
+    """
+    Result of the job under key if it was started for these inputs and has finished, else None.
+    While it runs, shows its progress and a Cancel button and polls again after POLL_INTERVAL.
+    """
+    saved = st.session_state.get(key)
+    if not saved or saved[0] != params:
+        return None
+    if saved[2] is not None:
+        return saved[2]
+    runner = job_runner()
+    job = runner.poll(saved[1])
+    if job is None:
+        return None  # forgotten by the runner; the button starts it again
+    if job["state"] == "done":
+        st.session_state[key] = (params, saved[1], job["result"])
+        # stats of a job reused from an earlier identical run were recorded with it
+        recorded = st.session_state.setdefault("recorded_jobs", set())
+        if job["id"] not in recorded:
+            recorded.add(job["id"])
+            n_stats = len(st.session_state.get("solver_stats", []))
+            for stats in job["stats"]:
+                record_stats(stats)
+            refresh_stats_panel(n_stats)
+        return job["result"]
+    if job["state"] == "failed":
+        st.error(f"{label} failed: {job['error']}")
+        return None
+    if job["state"] == "cancelled":
+        st.warning(f"{label} cancelled.")
+        return None
+    st.progress(job["progress"], text=f"{label}... {job['message']}")
+    if st.button("Cancel", key=f"{key}_cancel"):
+        runner.cancel(saved[1])
+    else:
+        time.sleep(POLL_INTERVAL)
+    rerun_tab()
+    return None
+
+def record_stats(stats):
+    """Keep the stats of one solve for the sidebar panel (cached analyses do not solve, so add nothing)"""
+    if stats:
+        st.session_state.setdefault("solver_stats", []).append(stats)
+
+def refresh_stats_panel(n_before):
+    """Fragments cannot redraw the sidebar: rerun the whole app when a fragment recorded new stats"""
+    if len(st.session_state.get("solver_stats", [])) != n_before:
+        st.rerun()
+
+def stats_panel():
+    """Sidebar summary of the counters and stage timings of the solves since the last clear"""
+    st.header("Instrumentation")
+    st.checkbox("Collect solver counters and timings", key="instrument",
+                help="Cached analyses are not re-solved, so only new solves are measured.")
+    runs = st.session_state.get("solver_stats", [])
+    if not runs:
+        st.caption("No instrumented solves yet.")
+        return
+    counters, timers = {}, {}
+    for stats in runs:
+        for name, value in stats["counters"].items():
+            counters[name] = counters.get(name, 0) + value
+        for stage, seconds in stats["timers"].items():
+            timers[stage] = timers.get(stage, 0.0) + seconds
+    st.caption(f"{len(runs)} solves")
+    st.markdown("\n".join(f"- **{stage}**: {seconds * 1000:.1f} ms"
+                           for stage, seconds in sorted(timers.items(), key=lambda kv: -kv[1])))
+    st.markdown("\n".join(f"- {name.replace('_', ' ')}: {value:,}" for name, value in counters.items()))
+    if st.button("Clear timings"):
+        st.session_state["solver_stats"] = []
+        st.rerun()
+
+def read_png(png_file):
+    """PNG bytes of a rendered chart, so cached results do not depend on gantt.png staying unchanged"""
+    if png_file and os.path.exists(png_file):
+        with open(png_file, "rb") as fh:
+            return fh.read()
+    return None
+
 def create_pairing_options(n_modules):
     """Generate different pairing configurations for n modules"""
     modules = list(range(1, n_modules + 1))
     pairing_options = {}
-    
+
     # No pairing (all independent)
     pairing_options["Independent"] = []
-    
+
     # Sequential pairs (1-2, 3-4, etc.)
     sequential_pairs = []
     for i in range(0, len(modules), 2):
@@ -24,11 +199,11 @@ def create_pairing_options(n_modules):
             sequential_pairs.append((modules[i], modules[i+1]))
     if sequential_pairs:
         pairing_options["Sequential"] = sequential_pairs
-    
+
     # Alternate pairs (1-3, 2-4, etc.)
     if n_modules == 4:
         pairing_options["Alternate"] = [(1, 3), (2, 4)]
-    
+
     # All possible unique pairings (for smaller module counts)
     if n_modules <= 6:
         all_pairs = list(combinations(modules, 2))
@@ -37,163 +212,267 @@ def create_pairing_options(n_modules):
             pairing_options["Custom A"] = all_pairs[:2]
         if len(all_pairs) >= 4:
             pairing_options["Custom B"] = all_pairs[1:3]
-    
+
     return pairing_options
 
-def analyze_desorption_strategy(schedule_data, ads_dur, des_dur, cool_dur, fan_pairs, horizon, des_cap, cool_cap, strategy="interleaved"):
+def analyze_pairings(n, ads_val, des_val, cool_val, horizon, des_cap, cool_cap, instrument=False, job=None):
+    """Schedule every pairing option for n identical modules; one result row per configuration (background job)"""
+    ads_dur = {i: ads_val for i in range(1, n+1)}
+    des_dur = {i: des_val for i in range(1, n+1)}
+    cool_dur = {i: cool_val for i in range(1, n+1)}
+    results = []
+    pairing_options = create_pairing_options(n)
+    for k, (config_name, fan_pairs) in enumerate(pairing_options.items()):
+        if job.cancelled():
+            break
+        job.report(k / len(pairing_options), results, f"{config_name} ({k + 1}/{len(pairing_options)})")
+        try:
+            per_module_done, total_done, _ = solve_schedule(
+                ads_dur, des_dur, cool_dur, fan_pairs, job=job, instrument=instrument,
+                desorption_capacity=des_cap, cooling_capacity=cool_cap,
+                fixed_makespan=horizon, multi_cycle=True, batched_sync=True, render=False
+            )
+
+            # Efficiency against the analytic upper bound (fan sharing and capacities included)
+            upper_bound = cycle_upper_bound(sorted(ads_dur), ads_dur, des_dur, cool_dur, fan_pairs,
+                                            horizon, des_cap, cool_cap)
+            efficiency = (total_done / upper_bound * 100) if upper_bound > 0 else 0
+
+            # Calculate balance (how evenly distributed cycles are)
+            cycle_counts = list(per_module_done.values())
+            balance = min(cycle_counts) / max(cycle_counts) * 100 if max(cycle_counts) > 0 else 0
+
+            results.append({
+                'Configuration': config_name,
+                'Fan Pairs': str(fan_pairs) if fan_pairs else "None",
+                'Total Cycles': total_done,
+                'Efficiency (%)': round(efficiency, 1),
+                'Balance (%)': round(balance, 1),
+                'Module Cycles': str(dict(per_module_done))
+            })
+        except Exception as e:
+            results.append({
+                'Configuration': config_name,
+                'Fan Pairs': str(fan_pairs) if fan_pairs else "None",
+                'Total Cycles': 0,
+                'Efficiency (%)': 0,
+                'Balance (%)': 0,
+                'Module Cycles': f"Error: {str(e)}"
+            })
+    return results
+
+def compare_strategies(n_strat, ads_strat, des_strat, cool_strat, horizon_strat, des_cap_strat, cool_cap_strat,
+                       selected_pairing, instrument=False, job=None):
     """
-    Analyze different desorption strategies:
-    - serialized: Complete desorption sequence locked for one module pair at a time
-    - interleaved: Allow overlapping of non-conflicting phases
+    Serialized / interleaved x batched_sync on / off in one schedule_strategies() pass (background job);
+    returns ({(strategy, batched_sync): (per_module_done, total, upper_bound)}, png_bytes)
     """
-    M = sorted(ads_dur.keys())
-    
-    if strategy == "serialized":
-        # Force sequential desorption - increase desorption capacity to 1 to serialize
-        return schedule_modules(ads_dur, des_dur, cool_dur, fan_pairs,
-                              desorption_capacity=1, cooling_capacity=1,
-                              fixed_makespan=horizon, multi_cycle=True, batched_sync=True)
-    else:  # interleaved
-        # Allow parallel desorption with original capacities
-        return schedule_modules(ads_dur, des_dur, cool_dur, fan_pairs,
-                              desorption_capacity=des_cap, cooling_capacity=cool_cap,
-                              fixed_makespan=horizon, multi_cycle=True, batched_sync=True)
+    ads_dur_strat = {i: ads_strat for i in range(1, n_strat+1)}
+    des_dur_strat = {i: des_strat for i in range(1, n_strat+1)}
+    cool_dur_strat = {i: cool_strat for i in range(1, n_strat+1)}
+    fan_pairs_strat = create_pairing_options(n_strat)[selected_pairing]
+    report = schedule_strategies(ads_dur_strat, des_dur_strat, cool_dur_strat, fan_pairs_strat, horizon_strat,
+                                 desorption_capacity=des_cap_strat, cooling_capacity=cool_cap_strat,
+                                 instrument=instrument, cancel=job.cancel_event,
+                                 progress=lambda fraction, total: job.report(fraction, message=f"{total} cycles"))
+    if report["stats"]:
+        job.stats.append(report["stats"])
+    variants = {key: (r["per_module_done"], r["total_done"], r["upper_bound"])
+                for key, r in report["variants"].items()}
+    return variants, read_png(report["png"])
+
+def find_optimal_configuration(opt_modules, opt_horizon, optimization_goal, instrument=False, job=None):
+    """Sweep durations x pairings (background job); returns (best_config, all_results)"""
+    # Test all combinations of parameters
+    ads_range = [20, 25, 30]
+    des_range = [15, 20, 25]
+    cool_range = [25, 30, 35]
+
+    best_config = None
+    best_score = 0
+    all_results = []
+    pairing_opts_opt = create_pairing_options(opt_modules)
+    n_configs = len(ads_range) * len(des_range) * len(cool_range) * len(pairing_opts_opt)
+    checked = 0
+
+    for ads_val in ads_range:
+        for des_val in des_range:
+            for cool_val in cool_range:
+                ads_dur_opt = {i: ads_val for i in range(1, opt_modules+1)}
+                des_dur_opt = {i: des_val for i in range(1, opt_modules+1)}
+                cool_dur_opt = {i: cool_val for i in range(1, opt_modules+1)}
+
+                for config_name, fan_pairs in pairing_opts_opt.items():
+                    if job.cancelled():
+                        return best_config, all_results
+                    job.report(checked / n_configs, best_config,
+                               f"{checked}/{n_configs} configurations, best score {best_score:.1f}")
+                    checked += 1
+                    upper_bound = cycle_upper_bound(list(range(1, opt_modules+1)), ads_dur_opt, des_dur_opt,
+                                                    cool_dur_opt, fan_pairs, opt_horizon, 2, 2)
+                    # skip configurations whose bound cannot beat the best score so far
+                    if optimization_goal == "Maximize Total Cycles" and best_config and upper_bound <= best_score:
+                        continue
+                    if optimization_goal == "Maximize Efficiency" and best_score >= 100:
+                        continue
+                    try:
+                        per_mod, total, _ = solve_schedule(
+                            ads_dur_opt, des_dur_opt, cool_dur_opt, fan_pairs, job=job, instrument=instrument,
+                            desorption_capacity=2, cooling_capacity=2,
+                            fixed_makespan=opt_horizon, multi_cycle=True, batched_sync=True,
+                            render=False
+                        )
+
+                        # Calculate score based on optimization goal
+                        if optimization_goal == "Maximize Total Cycles":
+                            score = total
+                        elif optimization_goal == "Maximize Efficiency":
+                            score = (total / upper_bound * 100) if upper_bound > 0 else 0
+                        else:  # Best Balance
+                            cycle_counts = list(per_mod.values())
+                            score = min(cycle_counts) / max(cycle_counts) * 100 if max(cycle_counts) > 0 else 0
+
+                        config = {
+                            'ads': ads_val, 'des': des_val, 'cool': cool_val,
+                            'pairing': config_name, 'fan_pairs': fan_pairs,
+                            'total_cycles': total, 'score': score,
+                            'per_module': per_mod
+                        }
+                        all_results.append(config)
+
+                        if score > best_score:
+                            best_score = score
+                            best_config = config
+
+                    except Exception:
+                        continue
+    return best_config, all_results
+
+def optimal_schedule(opt_modules, opt_horizon, ads, des, cool, fan_pairs, instrument=False, job=None):
+    """Schedule and chart for the chosen configuration (background job); returns (per_module_done, total, png_bytes)"""
+    per_mod, total, png = solve_schedule(
+        {i: ads for i in range(1, opt_modules+1)},
+        {i: des for i in range(1, opt_modules+1)},
+        {i: cool for i in range(1, opt_modules+1)},
+        fan_pairs, job=job, instrument=instrument,
+        progress=lambda fraction, total: job.report(fraction, total, f"{total} cycles so far"),
+        desorption_capacity=2, cooling_capacity=2,
+        fixed_makespan=opt_horizon, multi_cycle=True, batched_sync=True,
+        out_fn="gantt_optimal.png"
+    )
+    return per_mod, total, read_png(png)
 
 st.markdown("<h1 style='text-align: center;'>Enhanced Cycle Scheduler with Pairing Analysis</h1>", unsafe_allow_html=True)
 
 tab1, tab2, tab3 = st.tabs(["Pairing Comparison", "Desorption Strategy Analysis", "Optimization Dashboard"])
 
-with tab1:
+# sidebar widgets cannot live inside a fragment; changing them reruns the script,
+# but the other tabs only read their cached results back from session state
+with st.sidebar:
+    st.header("Configuration")
+    n = st.number_input("Number of modules", min_value=2, max_value=MAX_MODULES, value=4, step=1)
+
+    # Duration inputs in columns for better layout
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.subheader("Phase Durations")
+        ads_val = st.number_input("Adsorption (min)", 1, 120, 25)
+        des_val = st.number_input("Desorption (min)", 1, 120, 20)
+    with col2:
+        st.write("")  # spacer
+        cool_val = st.number_input("Cooling (min)", 1, 120, 30)
+        horizon = st.number_input("Analysis period (min)", 60, 1440, 600)
+    with col3:
+        st.subheader("Capacities")
+        des_cap = st.number_input("Desorption capacity", 1, MAX_MODULES, 2)
+        cool_cap = st.number_input("Cooling capacity", 1, MAX_MODULES, 2)
+
+    # mapped on the first run, so later lookups only read one record
+    table = schedule_table()
+    if table is not None:
+        st.caption(f"Lookup table: {len(table):,} precomputed configurations")
+
+    stats_panel()
+
+@fragment
+def pairing_tab(params):
     st.markdown("### Module Pairing Configuration Analysis")
-    
-    with st.sidebar:
-        st.header("Configuration")
-        n = st.number_input("Number of modules", min_value=2, max_value=8, value=4, step=1)
-        
-        # Duration inputs in columns for better layout
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            st.subheader("Phase Durations")
-            ads_val = st.number_input("Adsorption (min)", 1, 120, 25)
-            des_val = st.number_input("Desorption (min)", 1, 120, 20)
-        with col2:
-            st.write("")  # spacer
-            cool_val = st.number_input("Cooling (min)", 1, 120, 30)
-            horizon = st.number_input("Analysis period (min)", 60, 1440, 600)
-        with col3:
-            st.subheader("Capacities")
-            des_cap = st.number_input("Desorption capacity", 1, 8, 2)
-            cool_cap = st.number_input("Cooling capacity", 1, 8, 2)
-    
-    # Generate all possible pairing configurations
-    pairing_options = create_pairing_options(n)
-    
-    # Build duration dictionaries
-    ads_dur = {i: ads_val for i in range(1, n+1)}
-    des_dur = {i: des_val for i in range(1, n+1)}
-    cool_dur = {i: cool_val for i in range(1, n+1)}
-    
+
     if st.button("Analyze All Pairing Options"):
-        results = []
-        
-        with st.spinner("Analyzing different pairing configurations..."):
-            for config_name, fan_pairs in pairing_options.items():
-                try:
-                    per_module_done, total_done, png_file = schedule_modules(
-                        ads_dur, des_dur, cool_dur, fan_pairs,
-                        desorption_capacity=des_cap, cooling_capacity=cool_cap,
-                        fixed_makespan=horizon, multi_cycle=True, batched_sync=True
-                    )
-                    
-                    # Calculate efficiency metrics
-                    theoretical_max = horizon // (ads_val + des_val + cool_val)
-                    total_theoretical = theoretical_max * n
-                    efficiency = (total_done / total_theoretical * 100) if total_theoretical > 0 else 0
-                    
-                    # Calculate balance (how evenly distributed cycles are)
-                    cycle_counts = list(per_module_done.values())
-                    balance = min(cycle_counts) / max(cycle_counts) * 100 if max(cycle_counts) > 0 else 0
-                    
-                    results.append({
-                        'Configuration': config_name,
-                        'Fan Pairs': str(fan_pairs) if fan_pairs else "None",
-                        'Total Cycles': total_done,
-                        'Efficiency (%)': round(efficiency, 1),
-                        'Balance (%)': round(balance, 1),
-                        'Module Cycles': str(dict(per_module_done))
-                    })
-                except Exception as e:
-                    results.append({
-                        'Configuration': config_name,
-                        'Fan Pairs': str(fan_pairs) if fan_pairs else "None",
-                        'Total Cycles': 0,
-                        'Efficiency (%)': 0,
-                        'Balance (%)': 0,
-                        'Module Cycles': f"Error: {str(e)}"
-                    })
-        
-        # Use st.dataframe with height parameter to avoid PyArrow issues
-        results_df = pd.DataFrame(results)
-        st.subheader("Pairing Configuration Comparison")
-        
-        # Display results in a simple format without PyArrow
-        for i, row in results_df.iterrows():
-            with st.expander(f"{row['Configuration']} - {row['Total Cycles']} cycles"):
-                col1, col2, col3 = st.columns(3)
-                with col1:
-                    st.write(f"**Fan Pairs:** {row['Fan Pairs']}")
-                    st.write(f"**Total Cycles:** {row['Total Cycles']}")
-                with col2:
-                    st.write(f"**Efficiency:** {row['Efficiency (%)']}%")
-                    st.write(f"**Balance:** {row['Balance (%)']}%")
-                with col3:
-                    st.write(f"**Module Cycles:** {row['Module Cycles']}")
-        
-        # Visualize comparison
-        fig, (ax1, ax2, ax3) = plt.subplots(1, 3, figsize=(15, 5))
-        
-        # Total cycles comparison
-        ax1.bar(results_df['Configuration'], results_df['Total Cycles'], color='skyblue')
-        ax1.set_title('Total Cycles Completed')
-        ax1.set_ylabel('Cycles')
-        ax1.tick_params(axis='x', rotation=45)
-        
-        # Efficiency comparison
-        ax2.bar(results_df['Configuration'], results_df['Efficiency (%)'], color='lightgreen')
-        ax2.set_title('Efficiency (%)')
-        ax2.set_ylabel('Efficiency')
-        ax2.tick_params(axis='x', rotation=45)
-        
-        # Balance comparison
-        ax3.bar(results_df['Configuration'], results_df['Balance (%)'], color='salmon')
-        ax3.set_title('Load Balance (%)')
-        ax3.set_ylabel('Balance')
-        ax3.tick_params(axis='x', rotation=45)
-        
-        plt.tight_layout()
-        st.pyplot(fig)
-        
-        # Recommendations
-        if not results_df.empty:
-            best_total = results_df.loc[results_df['Total Cycles'].idxmax()]
-            best_efficiency = results_df.loc[results_df['Efficiency (%)'].idxmax()]
-            best_balance = results_df.loc[results_df['Balance (%)'].idxmax()]
-            
-            st.subheader("Recommendations")
+        start_job("pairing", params, analyze_pairings, *params)
+
+    # results stay visible across reruns, as long as they match the current inputs
+    results = job_result("pairing", params, "Analyzing different pairing configurations")
+    if results is None:
+        return
+
+    import pandas as pd
+    import matplotlib.pyplot as plt
+
+    # Use st.dataframe with height parameter to avoid PyArrow issues
+    results_df = pd.DataFrame(results)
+    st.subheader("Pairing Configuration Comparison")
+
+    # Display results in a simple format without PyArrow
+    for i, row in results_df.iterrows():
+        with st.expander(f"{row['Configuration']} - {row['Total Cycles']} cycles"):
             col1, col2, col3 = st.columns(3)
             with col1:
-                st.metric("Best Total Output", best_total['Configuration'], 
-                         f"{best_total['Total Cycles']} cycles")
+                st.write(f"**Fan Pairs:** {row['Fan Pairs']}")
+                st.write(f"**Total Cycles:** {row['Total Cycles']}")
             with col2:
-                st.metric("Most Efficient", best_efficiency['Configuration'],
-                         f"{best_efficiency['Efficiency (%)']}%")
+                st.write(f"**Efficiency:** {row['Efficiency (%)']}%")
+                st.write(f"**Balance:** {row['Balance (%)']}%")
             with col3:
-                st.metric("Best Balanced", best_balance['Configuration'],
-                         f"{best_balance['Balance (%)']}%")
+                st.write(f"**Module Cycles:** {row['Module Cycles']}")
 
-with tab2:
+    # Visualize comparison
+    fig, (ax1, ax2, ax3) = plt.subplots(1, 3, figsize=(15, 5))
+
+    # Total cycles comparison
+    ax1.bar(results_df['Configuration'], results_df['Total Cycles'], color='skyblue')
+    ax1.set_title('Total Cycles Completed')
+    ax1.set_ylabel('Cycles')
+    ax1.tick_params(axis='x', rotation=45)
+
+    # Efficiency comparison
+    ax2.bar(results_df['Configuration'], results_df['Efficiency (%)'], color='lightgreen')
+    ax2.set_title('Efficiency (%)')
+    ax2.set_ylabel('Efficiency')
+    ax2.tick_params(axis='x', rotation=45)
+
+    # Balance comparison
+    ax3.bar(results_df['Configuration'], results_df['Balance (%)'], color='salmon')
+    ax3.set_title('Load Balance (%)')
+    ax3.set_ylabel('Balance')
+    ax3.tick_params(axis='x', rotation=45)
+
+    plt.tight_layout()
+    st.pyplot(fig)
+    plt.close(fig)
+
+    # Recommendations
+    if not results_df.empty:
+        best_total = results_df.loc[results_df['Total Cycles'].idxmax()]
+        best_efficiency = results_df.loc[results_df['Efficiency (%)'].idxmax()]
+        best_balance = results_df.loc[results_df['Balance (%)'].idxmax()]
+
+        st.subheader("Recommendations")
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Best Total Output", best_total['Configuration'],
+                     f"{best_total['Total Cycles']} cycles")
+        with col2:
+            st.metric("Most Efficient", best_efficiency['Configuration'],
+                     f"{best_efficiency['Efficiency (%)']}%")
+        with col3:
+            st.metric("Best Balanced", best_balance['Configuration'],
+                     f"{best_balance['Balance (%)']}%")
+
+@fragment
+def strategy_tab():
     st.markdown("### Desorption Strategy Comparison")
-    
+
     col1, col2 = st.columns(2)
     with col1:
         st.info("""
@@ -202,7 +481,7 @@ with tab2:
         - No overlap in steam-intensive phases
         - More predictable resource usage
         """)
-    
+
     with col2:
         st.info("""
         **Interleaved Desorption**: 
@@ -210,10 +489,10 @@ with tab2:
         - One pair heating while another cooling
         - Higher throughput but more complex resource management
         """)
-    
+
     # Configuration for strategy comparison
-    n_strat = st.number_input("Modules for strategy analysis", 2, 6, 4, key="strat_modules")
-    
+    n_strat = st.number_input("Modules for strategy analysis", 2, MAX_MODULES, 4, key="strat_modules")
+
     col1, col2, col3 = st.columns(3)
     with col1:
         ads_strat = st.number_input("Adsorption duration", 1, 60, 25, key="strat_ads")
@@ -224,146 +503,106 @@ with tab2:
     with col3:
         des_cap_strat = st.number_input("Desorption capacity", 1, 4, 2, key="strat_des_cap")
         cool_cap_strat = st.number_input("Cooling capacity", 1, 4, 2, key="strat_cool_cap")
-    
+
     # Fan pairing selection for strategy analysis
     pairing_opts = create_pairing_options(n_strat)
-    selected_pairing = st.selectbox("Select fan pairing for analysis", 
+    selected_pairing = st.selectbox("Select fan pairing for analysis",
                                    list(pairing_opts.keys()))
-    
+    params = (n_strat, ads_strat, des_strat, cool_strat, horizon_strat, des_cap_strat, cool_cap_strat, selected_pairing)
+
     if st.button("Compare Desorption Strategies"):
-        ads_dur_strat = {i: ads_strat for i in range(1, n_strat+1)}
-        des_dur_strat = {i: des_strat for i in range(1, n_strat+1)}
-        cool_dur_strat = {i: cool_strat for i in range(1, n_strat+1)}
-        fan_pairs_strat = pairing_opts[selected_pairing]
-        
-        # Run both strategies
-        with st.spinner("Comparing desorption strategies..."):
-            # Serialized
-            per_mod_ser, total_ser, png_ser = analyze_desorption_strategy(
-                None, ads_dur_strat, des_dur_strat, cool_dur_strat, fan_pairs_strat,
-                horizon_strat, des_cap_strat, cool_cap_strat, "serialized"
-            )
-            
-            # Interleaved
-            per_mod_int, total_int, png_int = analyze_desorption_strategy(
-                None, ads_dur_strat, des_dur_strat, cool_dur_strat, fan_pairs_strat,
-                horizon_strat, des_cap_strat, cool_cap_strat, "interleaved"
-            )
-        
-        # Display comparison
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            st.subheader("Serialized Desorption")
-            st.metric("Total Cycles", total_ser)
-            for mod, cycles in per_mod_ser.items():
-                st.write(f"Module {mod}: {cycles} cycles")
-            if png_ser and os.path.exists(png_ser):
-                st.image(png_ser, caption="Serialized Schedule")
-        
-        with col2:
-            st.subheader("Interleaved Desorption")
-            st.metric("Total Cycles", total_int)
-            for mod, cycles in per_mod_int.items():
-                st.write(f"Module {mod}: {cycles} cycles")
-            if png_int and os.path.exists(png_int):
-                st.image(png_int, caption="Interleaved Schedule")
-        
-        # Performance comparison
-        improvement = ((total_int - total_ser) / total_ser * 100) if total_ser > 0 else 0
-        st.metric("Interleaved Improvement", f"{improvement:.1f}%", 
-                 f"{total_int - total_ser} more cycles")
+        start_job("strategy", params, compare_strategies, *params)
 
-with tab3:
+    saved = job_result("strategy", params, "Comparing desorption strategies")
+    if saved is None:
+        return
+    variants, png = saved
+
+    # Display comparison: one row per strategy x batched_sync variant
+    import pandas as pd
+    rows = []
+    for (strategy, batched_sync), (per_mod, total, upper_bound) in variants.items():
+        rows.append({
+            'Strategy': strategy.capitalize(),
+            'Batched Sync': "On" if batched_sync else "Off",
+            'Total Cycles': total,
+            'Upper Bound': upper_bound,
+            'Efficiency (%)': round(total / upper_bound * 100, 1) if upper_bound else 0,
+            'Module Cycles': ", ".join(f"M{mod}:{cycles}" for mod, cycles in per_mod.items()),
+        })
+    st.dataframe(pd.DataFrame(rows))
+    if png:
+        st.image(png, caption="Schedules of every distinct variant")
+
+    # Performance comparison (batched sync, as the plant runs it)
+    total_ser = variants[("serialized", True)][1]
+    total_int = variants[("interleaved", True)][1]
+    improvement = ((total_int - total_ser) / total_ser * 100) if total_ser > 0 else 0
+    st.metric("Interleaved Improvement", f"{improvement:.1f}%",
+             f"{total_int - total_ser} more cycles")
+
+@fragment
+def optimization_tab():
     st.markdown("### Automatic Optimization Dashboard")
-    
+
     st.info("This section will automatically find the optimal pairing and strategy configuration")
-    
+
     # Optimization parameters
     col1, col2 = st.columns(2)
     with col1:
-        opt_modules = st.number_input("Modules to optimize", 2, 8, 4, key="opt_modules")
+        opt_modules = st.number_input("Modules to optimize", 2, MAX_MODULES, 4, key="opt_modules")
         opt_horizon = st.number_input("Optimization period", 60, 1440, 600, key="opt_horizon")
-        
+
     with col2:
-        optimization_goal = st.selectbox("Optimization Goal", 
+        optimization_goal = st.selectbox("Optimization Goal",
                                        ["Maximize Total Cycles", "Maximize Efficiency", "Best Balance"])
-    
+    params = (opt_modules, opt_horizon, optimization_goal)
+
     if st.button("Find Optimal Configuration"):
-        with st.spinner("Finding optimal configuration..."):
-            # Test all combinations of parameters
-            ads_range = [20, 25, 30]
-            des_range = [15, 20, 25]
-            cool_range = [25, 30, 35]
-            
-            best_config = None
-            best_score = 0
-            all_results = []
-            
-            for ads_val in ads_range:
-                for des_val in des_range:
-                    for cool_val in cool_range:
-                        ads_dur_opt = {i: ads_val for i in range(1, opt_modules+1)}
-                        des_dur_opt = {i: des_val for i in range(1, opt_modules+1)}
-                        cool_dur_opt = {i: cool_val for i in range(1, opt_modules+1)}
-                        
-                        pairing_opts_opt = create_pairing_options(opt_modules)
-                        
-                        for config_name, fan_pairs in pairing_opts_opt.items():
-                            try:
-                                per_mod, total, _ = schedule_modules(
-                                    ads_dur_opt, des_dur_opt, cool_dur_opt, fan_pairs,
-                                    desorption_capacity=2, cooling_capacity=2,
-                                    fixed_makespan=opt_horizon, multi_cycle=True, batched_sync=True
-                                )
-                                
-                                # Calculate score based on optimization goal
-                                if optimization_goal == "Maximize Total Cycles":
-                                    score = total
-                                elif optimization_goal == "Maximize Efficiency":
-                                    theoretical = opt_horizon // (ads_val + des_val + cool_val) * opt_modules
-                                    score = (total / theoretical * 100) if theoretical > 0 else 0
-                                else:  # Best Balance
-                                    cycle_counts = list(per_mod.values())
-                                    score = min(cycle_counts) / max(cycle_counts) * 100 if max(cycle_counts) > 0 else 0
-                                
-                                config = {
-                                    'ads': ads_val, 'des': des_val, 'cool': cool_val,
-                                    'pairing': config_name, 'fan_pairs': fan_pairs,
-                                    'total_cycles': total, 'score': score,
-                                    'per_module': per_mod
-                                }
-                                all_results.append(config)
-                                
-                                if score > best_score:
-                                    best_score = score
-                                    best_config = config
-                                    
-                            except Exception:
-                                continue
-        
-        if best_config:
-            st.success("Optimal Configuration Found!")
-            
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                st.metric("Adsorption Duration", f"{best_config['ads']} min")
-                st.metric("Desorption Duration", f"{best_config['des']} min")
-            with col2:
-                st.metric("Cooling Duration", f"{best_config['cool']} min")
-                st.metric("Fan Pairing", best_config['pairing'])
-            with col3:
-                st.metric("Total Cycles", best_config['total_cycles'])
-                st.metric("Optimization Score", f"{best_config['score']:.1f}")
-            
-            # Show per-module breakdown
-            st.subheader("Per-Module Performance")
-            for mod, cycles in best_config['per_module'].items():
-                st.write(f"Module {mod}: {cycles} cycles")
-            
-            # Generate final schedule with optimal parameters
-            if st.button("Generate Optimal Schedule"):
-                ads_dur_final = {i: best_config['ads'] for i in range(1, opt_modules+1)}
-                des_dur_final = {i: best_config['des'] for i in range(1, opt_modules+1)}
-                cool_dur_final = {i: best_config['cool'] for i in range(1, opt_modules+1)}
-                
\ No newline at end of file
+        start_job("optimization", params, find_optimal_configuration, *params)
+
+    # best_config lives in session state, so the button below no longer discards it
+    saved = job_result("optimization", params, "Finding optimal configuration")
+    if saved is None:
+        return
+    best_config, all_results = saved
+
+    if best_config:
+        st.success("Optimal Configuration Found!")
+
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Adsorption Duration", f"{best_config['ads']} min")
+            st.metric("Desorption Duration", f"{best_config['des']} min")
+        with col2:
+            st.metric("Cooling Duration", f"{best_config['cool']} min")
+            st.metric("Fan Pairing", best_config['pairing'])
+        with col3:
+            st.metric("Total Cycles", best_config['total_cycles'])
+            st.metric("Optimization Score", f"{best_config['score']:.1f}")
+
+        # Show per-module breakdown
+        st.subheader("Per-Module Performance")
+        for mod, cycles in best_config['per_module'].items():
+            st.write(f"Module {mod}: {cycles} cycles")
+
+        # Generate final schedule with optimal parameters
+        if st.button("Generate Optimal Schedule"):
+            start_job("optimal_schedule", params, optimal_schedule,
+                      opt_modules, opt_horizon, best_config['ads'], best_config['des'],
+                      best_config['cool'], best_config['fan_pairs'])
+
+        saved_schedule = job_result("optimal_schedule", params, "Generating schedule")
+        if saved_schedule and saved_schedule[2]:
+            st.image(saved_schedule[2], caption="Optimal Schedule")
+
+with tab1:
+    pairing_tab((n, ads_val, des_val, cool_val, horizon, des_cap, cool_cap))
+
+with tab2:
+    strategy_tab()
+
+with tab3:
+    optimization_tab()
+
+rerun_pending()
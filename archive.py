@@ -0,0 +1,190 @@
+"""
+Columnar export of schedule results and memory-mapped loading.
+
+A library is a directory holding one .npy file per interval column (all
+schedules concatenated) plus manifest.json describing each schedule: its row
+range, per-module row offsets, per_module_done, total_done, engine and input
+problem. The .npy files are written with the stdlib, so numpy is not needed to
+create or read a library, but numpy.load(path, mmap_mode="r") opens them too.
+"""
+import ast
+import json
+import mmap
+import os
+import sys
+from array import array
+
+from intervals import COLUMNS, IntervalTable
+
+FORMAT = "module-pairs-schedules"
+VERSION = 1
+MANIFEST = "manifest.json"
+
+_ENDIAN = "<" if sys.byteorder == "little" else ">"
+_NPY_DESCR = {"h": "i2", "i": "i4", "b": "i1"}
+
+
+def _write_npy(path, col):
+    """Write an array('h'|'i'|'b') as a 1-D .npy (format 1.0) file."""
+    descr = _ENDIAN + _NPY_DESCR[col.typecode] if col.itemsize > 1 else "|" + _NPY_DESCR[col.typecode]
+    header = "{'descr': '%s', 'fortran_order': False, 'shape': (%d,), }" % (descr, len(col))
+    pad = 64 - (10 + len(header) + 1) % 64
+    header = header + " " * (pad % 64) + "\n"
+    with open(path, "wb") as fh:
+        fh.write(b"\x93NUMPY\x01\x00")
+        fh.write(len(header).to_bytes(2, "little"))
+        fh.write(header.encode("latin1"))
+        col.tofile(fh)
+
+
+def _map_npy(path, typecode):
+    """Memory-map a .npy file written by _write_npy; returns (mmap, memoryview cast to typecode)."""
+    with open(path, "rb") as fh:
+        mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+    if mm[:6] != b"\x93NUMPY":
+        mm.close()
+        raise ValueError(f"{path} is not a .npy file")
+    hlen = int.from_bytes(mm[8:10], "little")
+    header = ast.literal_eval(mm[10:10 + hlen].decode("latin1"))
+    if header["descr"][1:] != _NPY_DESCR[typecode] or header["descr"][0] not in ("|", _ENDIAN):
+        mm.close()
+        raise ValueError(f"{path}: unexpected dtype {header['descr']}")
+    view = memoryview(mm)[10 + hlen:].cast(typecode)
+    return mm, view
+
+
+def _intkeys(d):
+    return {int(k): v for k, v in d.items()}
+
+
+def save_schedules(path, results):
+    """
+    Export schedule results (dicts from schedule_modules(..., return_result=True),
+    reschedule() or sweeps) to the library directory path.
+    Returns the number of schedules written.
+    """
+    os.makedirs(path, exist_ok=True)
+    columns = {name: array(code) for name, code in COLUMNS}
+    totals = array("i")
+    schedules = []
+    for n, result in enumerate(results):
+        table = result["intervals"]
+        if not isinstance(table, IntervalTable):
+            table = IntervalTable.from_records(table)
+        lo = len(columns["start"])
+        for name, _ in COLUMNS:
+            columns[name].extend(getattr(table, name))
+        totals.append(result["total_done"])
+        problem = result.get("problem")
+        schedules.append({
+            "id": n,
+            "name": result.get("name"),
+            "rows": [lo, len(columns["start"])],
+            "offsets": {str(i): [lo + a, lo + b] for i, (a, b) in table.offsets.items()},
+            "per_module_done": {str(i): v for i, v in result["per_module_done"].items()},
+            "total_done": result["total_done"],
+            "horizon": result.get("horizon"),
+            "engine": result.get("engine"),
+            "status": result.get("status"),
+            "runtime": result.get("runtime"),
+            "problem": None if problem is None else {
+                k: ({str(i): v for i, v in val.items()} if isinstance(val, dict) else val)
+                for k, val in problem.items()
+            },
+        })
+
+    manifest = {"format": FORMAT, "version": VERSION, "rows": len(columns["start"]), "columns": {}, "schedules": schedules}
+    for name, code in COLUMNS + (("total_done", "i"),):
+        fn = f"{name}.npy"
+        _write_npy(os.path.join(path, fn), totals if name == "total_done" else columns[name])
+        manifest["columns"][name] = {"file": fn, "typecode": code}
+    with open(os.path.join(path, MANIFEST), "w") as fh:
+        json.dump(manifest, fh)
+    return len(schedules)
+
+
+class ScheduleLibrary:
+    """
+    Read-only view of a library written by save_schedules(). Interval columns are
+    memory-mapped, so opening a library and querying schedules copies nothing;
+    table(n) returns an IntervalTable backed by slices of the mapped files.
+    """
+
+    def __init__(self, path):
+        with open(os.path.join(path, MANIFEST)) as fh:
+            manifest = json.load(fh)
+        if manifest.get("format") != FORMAT or manifest.get("version") != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} schedule library")
+        self.path = path
+        self._maps = []
+        self.columns = {}
+        for name, spec in manifest["columns"].items():
+            mm, view = _map_npy(os.path.join(path, spec["file"]), spec["typecode"])
+            self._maps.append(mm)
+            self.columns[name] = view
+        self.schedules = manifest["schedules"]
+        for entry in self.schedules:
+            entry["offsets"] = {int(i): tuple(r) for i, r in entry["offsets"].items()}
+            entry["per_module_done"] = _intkeys(entry["per_module_done"])
+            if entry["problem"]:
+                entry["problem"] = {k: (_intkeys(v) if isinstance(v, dict) else v) for k, v in entry["problem"].items()}
+                if entry["problem"].get("fan_pairs") is not None:
+                    entry["problem"]["fan_pairs"] = [tuple(pair) for pair in entry["problem"]["fan_pairs"]]
+
+    def __len__(self):
+        return len(self.schedules)
+
+    def table(self, n):
+        """IntervalTable for schedule n, sharing memory with the mapped columns."""
+        entry = self.schedules[n]
+        lo, hi = entry["rows"]
+        columns = {name: self.columns[name][lo:hi] for name, _ in COLUMNS}
+        offsets = {i: (a - lo, b - lo) for i, (a, b) in entry["offsets"].items()}
+        return IntervalTable(columns, sorted(offsets), offsets)
+
+    def result(self, n):
+        """Schedule n in the schedule_modules result format (intervals as an IntervalTable)."""
+        entry = self.schedules[n]
+        return {
+            "engine": entry["engine"],
+            "status": entry["status"],
+            "intervals": self.table(n),
+            "per_module_done": entry["per_module_done"],
+            "total_done": entry["total_done"],
+            "horizon": entry["horizon"],
+            "makespan": entry["horizon"],
+            "bound": None,
+            "runtime": entry["runtime"],
+            "png": None,
+            "problem": entry["problem"],
+        }
+
+    def totals(self):
+        """total_done of every schedule, as a memory-mapped int column."""
+        return self.columns["total_done"]
+
+    def close(self):
+        """
+        Unmap the columns. Tables and results still referenced keep slices of the mapped
+        files alive; those maps are left open and unmapped once the last slice is dropped.
+        """
+        for view in self.columns.values():
+            view.release()
+        self.columns = {}
+        for mm in self._maps:
+            try:
+                mm.close()
+            except BufferError:
+                pass  # exported slices still in use; the map closes when they are collected
+        self._maps = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def load_schedules(path):
+    """Open a schedule library directory for zero-copy querying."""
+    return ScheduleLibrary(path)
@@ -0,0 +1,269 @@
+"""
+Non-interactive batch runner for schedule_modules.
+
+    python schedule.py scenarios.jsonl -o results.jsonl -j 8
+    python batch.py scenarios.csv -o - --archive sweeps/nightly
+    python batch.py scenarios.jsonl --service http://127.0.0.1:8765
+    python batch.py scenarios.jsonl --table schedule_table.bin
+
+Scenario files may be JSON (a list of scenarios, or {"scenarios": [...]}),
+JSONL (one scenario per line) or CSV (one scenario per row). A scenario uses
+the schedule_modules keyword names:
+
+    name, ads_dur, des_dur, cool_dur, fan_pairs, desorption_capacity,
+    cooling_capacity, fixed_makespan, plot_horizon, multi_cycle, batched_sync,
+    engine, time_limit, need_optimal, enforce_no_idle_modules, instrument, validate
+
+Durations are a list (modules 1..n), a {module: minutes} mapping or a
+comma-separated string; fan_pairs is a list of pairs or a string like "1-2,3-4".
+Each result is written as one JSON line as soon as it finishes, with the
+scenario index and name, per-module and total cycles, the upper bound on
+cycles and the gap to it, the engine used, the engine runtime and the wall
+time including worker overhead; scenarios with instrument=true also get the
+engine's counters and stage timings as "stats", and with validate=true the
+constraint violations found by validate.py (an empty list for a valid
+schedule) as "violations". With --table, scenarios covered by a precomputed
+lookup table (see table.py) are answered from it and marked "table": true;
+the rest are solved live.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+SCENARIO_KEYS = (
+    "desorption_capacity", "cooling_capacity", "fixed_makespan", "plot_horizon",
+    "multi_cycle", "batched_sync", "engine", "time_limit", "need_optimal",
+    "enforce_no_idle_modules", "instrument", "validate",
+)
+INT_KEYS = ("desorption_capacity", "cooling_capacity", "fixed_makespan", "plot_horizon")
+BOOL_KEYS = ("multi_cycle", "batched_sync", "need_optimal", "enforce_no_idle_modules", "instrument", "validate")
+
+
+def parse_durations(value):
+    """List, {module: minutes} mapping or "12,15,10" string -> {module: minutes}."""
+    if isinstance(value, dict):
+        return {int(k): int(v) for k, v in value.items()}
+    if isinstance(value, str):
+        value = [p.strip() for p in value.split(",") if p.strip()]
+    return {i + 1: int(v) for i, v in enumerate(value)}
+
+
+def parse_fan_pairs(value):
+    """List of pairs or "1-2,3-4" string -> [(1, 2), (3, 4)]."""
+    if not value:
+        return []
+    if isinstance(value, str):
+        pairs = []
+        for token in value.split(","):
+            a, b = token.split("-")
+            pairs.append((int(a.strip()), int(b.strip())))
+        return pairs
+    return [(int(a), int(b)) for a, b in value]
+
+
+def _parse_bool(value):
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes", "y")
+    return bool(value)
+
+
+def normalize_scenario(raw, index):
+    """Turn one raw scenario (from JSON or CSV) into schedule_modules arguments."""
+    scn = {
+        "name": str(raw.get("name") or f"scenario-{index}"),
+        "ads_dur": parse_durations(raw["ads_dur"]),
+        "des_dur": parse_durations(raw["des_dur"]),
+        "cool_dur": parse_durations(raw["cool_dur"]),
+        "fan_pairs": parse_fan_pairs(raw.get("fan_pairs")),
+    }
+    if not len(scn["ads_dur"]) == len(scn["des_dur"]) == len(scn["cool_dur"]):
+        raise ValueError(f"{scn['name']}: ads_dur, des_dur and cool_dur must list the same modules")
+    for key in SCENARIO_KEYS:
+        value = raw.get(key)
+        if value is None or value == "":
+            continue
+        if key in INT_KEYS:
+            value = int(value)
+        elif key in BOOL_KEYS:
+            value = _parse_bool(value)
+        elif key == "time_limit":
+            value = float(value)
+        scn[key] = value
+    return scn
+
+
+def load_scenarios(path):
+    """
+    Read a .json, .jsonl or .csv scenario file ("-" reads JSONL from stdin).
+    Returns the raw scenarios; each is validated by run_scenario() so one bad
+    row is reported in its result line instead of aborting the whole batch.
+    """
+    if path == "-":
+        raws = [json.loads(line) for line in sys.stdin if line.strip()]
+    else:
+        ext = os.path.splitext(path)[1].lower()
+        with open(path, newline="") as fh:
+            if ext == ".csv":
+                raws = list(csv.DictReader(fh))
+            elif ext == ".jsonl":
+                raws = [json.loads(line) for line in fh if line.strip()]
+            else:
+                data = json.load(fh)
+                raws = data.get("scenarios", [data]) if isinstance(data, dict) else data
+    return raws
+
+
+def run_scenario(index, raw, png_dir=None, with_intervals=False, table=None):
+    """
+    Validate and solve one raw scenario; never raises, errors are reported in the result line.
+    table: optional lookup table path (see table.py) tried before solving.
+    """
+    from schedule import schedule_modules
+
+    t0 = time.perf_counter()
+    out = {"index": index, "name": str(raw.get("name") or f"scenario-{index}")}
+    try:
+        scn = normalize_scenario(raw, index)
+        kwargs = {k: v for k, v in scn.items() if k not in ("name", "ads_dur", "des_dur", "cool_dur", "fan_pairs")}
+        kwargs.setdefault("multi_cycle", True)
+        result = None
+        if table and not with_intervals:
+            from table import load_table, table_result
+            result = table_result(load_table(table), scn["ads_dur"], scn["des_dur"], scn["cool_dur"],
+                                  scn["fan_pairs"], render=png_dir is not None, **kwargs)
+        if result is None:
+            result = schedule_modules(
+                scn["ads_dur"], scn["des_dur"], scn["cool_dur"], scn["fan_pairs"],
+                render=png_dir is not None,
+                out_fn=os.path.join(png_dir, f"{scn['name']}.png") if png_dir else "gantt.png",
+                return_result=True, **kwargs
+            )
+    except Exception as e:
+        out.update({"ok": False, "error": f"{type(e).__name__}: {e}", "wall_time": time.perf_counter() - t0})
+        return out, None
+    out.update({
+        "ok": True,
+        "engine": result["engine"],
+        "status": result["status"],
+        "per_module_done": result["per_module_done"],
+        "total_done": result["total_done"],
+        "upper_bound": result["upper_bound"],
+        "gap": result["gap"],
+        "runtime": result["runtime"],
+        "png": result["png"],
+    })
+    if result["stats"] is not None:
+        out["stats"] = result["stats"]
+    if result["violations"] is not None:
+        out["violations"] = result["violations"]
+    if result.get("table"):
+        out["table"] = True
+    if with_intervals:
+        out["intervals"] = [list(rec) for rec in result["intervals"]]
+    out["wall_time"] = time.perf_counter() - t0
+    return out, result
+
+
+def run_via_service(index, raw, url, render=False, with_intervals=False):
+    """Like run_scenario, but solved by the scheduling service at url (see service.py)."""
+    from service import request_schedule
+
+    t0 = time.perf_counter()
+    try:
+        line = request_schedule(dict(raw, render=render, intervals=with_intervals), url)
+    except Exception as e:
+        line = {"name": str(raw.get("name") or f"scenario-{index}"), "ok": False, "error": f"{type(e).__name__}: {e}"}
+    line["index"] = index
+    line["wall_time"] = time.perf_counter() - t0
+    return line, None
+
+
+def run_batch(scenarios, out, workers=None, png_dir=None, with_intervals=False, archive=None, service=None,
+              table=None):
+    """
+    Run scenarios across a process pool (or as concurrent requests to the scheduling
+    service at URL service) and write one JSON line per scenario to the file object
+    out, in completion order. table: lookup table path answering covered scenarios
+    without solving. Returns the number of failed scenarios.
+    """
+    if png_dir:
+        os.makedirs(png_dir, exist_ok=True)
+    failed = 0
+    kept = {}
+    t0 = time.perf_counter()
+    if service:
+        pool = ThreadPoolExecutor(max_workers=workers or 8)
+        futures = [pool.submit(run_via_service, n, scn, service, bool(png_dir), with_intervals)
+                   for n, scn in enumerate(scenarios)]
+        done = (f.result() for f in as_completed(futures))
+    elif workers == 1:
+        done = (run_scenario(n, scn, png_dir, with_intervals, table) for n, scn in enumerate(scenarios))
+    else:
+        pool = ProcessPoolExecutor(max_workers=workers)
+        futures = [pool.submit(run_scenario, n, scn, png_dir, with_intervals, table)
+                   for n, scn in enumerate(scenarios)]
+        done = (f.result() for f in as_completed(futures))
+    try:
+        for line, result in done:
+            if not line["ok"]:
+                failed += 1
+            elif archive:
+                result["name"] = line["name"]
+                kept[line["index"]] = result
+            out.write(json.dumps(line) + "\n")
+            out.flush()
+    finally:
+        if service or workers != 1:
+            pool.shutdown()
+    if archive:
+        from archive import save_schedules
+        save_schedules(archive, [kept[n] for n in sorted(kept)])
+    print(f"{len(scenarios)} scenarios, {failed} failed, {time.perf_counter() - t0:.2f}s", file=sys.stderr)
+    return failed
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Run schedule_modules over a file of scenarios.")
+    ap.add_argument("scenarios", help="scenario file (.json, .jsonl, .csv) or - for JSONL on stdin")
+    ap.add_argument("-o", "--output", default="-", help="JSONL results file (default: stdout)")
+    ap.add_argument("-j", "--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    ap.add_argument("--png-dir", default=None, help="also render a Gantt PNG per scenario into this directory")
+    ap.add_argument("--intervals", action="store_true", help="include the scheduled intervals in each result")
+    ap.add_argument("--archive", default=None, help="also save all schedules as a columnar library (see archive.py)")
+    ap.add_argument("--service", default=None,
+                    help="send scenarios to a running scheduling service (http://host:port or unix:///path)")
+    ap.add_argument("--table", default=None, help="answer covered scenarios from this lookup table (see table.py)")
+    args = ap.parse_args(argv)
+    if args.service and args.archive:
+        raise SystemExit("--archive needs local solving; it cannot be combined with --service")
+    if args.table and (args.archive or args.service):
+        raise SystemExit("--table answers without intervals or a service; it cannot be combined with "
+                         "--archive or --service")
+    if args.table:
+        from table import load_table
+        try:
+            load_table(args.table)
+        except (OSError, ValueError) as e:
+            raise SystemExit(f"Could not open table: {e}")
+
+    try:
+        scenarios = load_scenarios(args.scenarios)
+    except (OSError, ValueError) as e:
+        raise SystemExit(f"Could not read scenarios: {e}")
+
+    if args.output == "-":
+        failed = run_batch(scenarios, sys.stdout, args.workers, args.png_dir, args.intervals, args.archive,
+                           args.service, args.table)
+    else:
+        with open(args.output, "w") as out:
+            failed = run_batch(scenarios, out, args.workers, args.png_dir, args.intervals, args.archive,
+                               args.service, args.table)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,287 @@
+"""
+Reproducible benchmark of the scheduling engines.
+
+    python bench/bench_engines.py --matrix quick -o bench/results.json
+    python bench/bench_engines.py --matrix full --baseline bench/baseline.json
+    python bench/bench_engines.py --matrix quick --save-baseline bench/baseline.json
+
+Engines benchmarked (see schedule.ENGINES):
+    greedy          fallback_greedy, independent cooling
+    greedy-batched  fallback_greedy with batched_sync=True
+    cpsat           CP-SAT multi-cycle model (cycles mode)
+    cpsat-makespan  CP-SAT single-cycle makespan model
+
+over a matrix of module counts x horizons (minutes) x capacities x fan groupings;
+cpsat-makespan schedules one cycle per module whatever the horizon, so it runs
+once per module count x capacity x fan grouping.
+Each case runs in a fresh child process with a timeout and records wall time,
+peak Python heap (tracemalloc), peak RSS growth, cycles completed and, for
+CP-SAT, the best objective bound; multi-cycle cases also report their gap to
+the CP-SAT bound of the same instance when one was computed. Every schedule
+is checked with validate.py (outside the timed runs) and its violation count
+recorded. Durations are drawn from a fixed seed so every run solves the same
+instances.
+
+With --baseline, cases whose wall time grew by more than --tolerance (and by
+at least --min-delta seconds) or whose cycle count dropped are flagged as
+regressions and the exit status is 1; so is any schedule with violations, any
+CP-SAT case that ends without an OPTIMAL/FEASIBLE solution of its own, and any
+multi-cycle CP-SAT case with no cycles where greedy finds some.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MATRICES = {
+    "quick": {
+        "modules": [4, 16],
+        "horizons": [60, 600],
+        "capacities": [1, 2],
+        "fans": ["none", "pairs"],
+    },
+    "full": {
+        "modules": [4, 16, 64, 256],
+        "horizons": [60, 600, 1440, 10080],
+        "capacities": [1, 2, 4],
+        "fans": ["none", "pairs", "chains4"],
+    },
+}
+ENGINE_CASES = {
+    "greedy": {"engine": "greedy", "multi_cycle": True, "batched_sync": False},
+    "greedy-batched": {"engine": "greedy", "multi_cycle": True, "batched_sync": True},
+    "cpsat": {"engine": "cpsat", "multi_cycle": True, "batched_sync": False},
+    "cpsat-makespan": {"engine": "cpsat-makespan", "multi_cycle": False, "batched_sync": False},
+}
+SEED = 20240601
+
+
+def make_instance(n_modules, fans, seed=SEED):
+    """Deterministic durations (minutes) and fan pairs for n_modules modules."""
+    rng = random.Random(seed * 1000 + n_modules)
+    ads = {i: rng.randint(15, 35) for i in range(1, n_modules + 1)}
+    des = {i: rng.randint(10, 30) for i in range(1, n_modules + 1)}
+    cool = {i: rng.randint(20, 40) for i in range(1, n_modules + 1)}
+    if fans == "pairs":
+        fan_pairs = [(i, i + 1) for i in range(1, n_modules, 2)]
+    elif fans == "chains4":
+        # groups of four linked as a chain 1-2, 2-3, 3-4 (transitive fan sharing)
+        fan_pairs = [(i, i + 1) for g in range(1, n_modules + 1, 4) for i in range(g, min(g + 3, n_modules))]
+    else:
+        fan_pairs = []
+    return ads, des, cool, fan_pairs
+
+
+def case_key(case):
+    horizon = f"/h{case['horizon']}" if case["horizon"] is not None else ""
+    return f"{case['engine_case']}/m{case['modules']}{horizon}/c{case['capacity']}/{case['fans']}"
+
+
+def _run_case(case, time_limit, repeat, queue):
+    """Child process body: solve one case (best wall time of repeat runs) and put its measurements on queue."""
+    import resource
+    import tracemalloc
+
+    sys.path.insert(0, ROOT)
+    from schedule import schedule_modules
+    from validate import validate
+
+    spec = ENGINE_CASES[case["engine_case"]]
+    ads, des, cool, fan_pairs = make_instance(case["modules"], case["fans"])
+    kwargs = dict(
+        desorption_capacity=case["capacity"], cooling_capacity=case["capacity"],
+        fixed_makespan=case["horizon"] if spec["multi_cycle"] else None,
+        multi_cycle=spec["multi_cycle"], batched_sync=spec["batched_sync"],
+        engine=spec["engine"], time_limit=time_limit, render=False, return_result=True,
+    )
+    rss0 = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    wall = None
+    for _ in range(max(1, repeat)):
+        t0 = time.perf_counter()
+        try:
+            result = schedule_modules(ads, des, cool, fan_pairs, **kwargs)
+        except Exception as e:
+            queue.put({"status": "ERROR", "wall_time": None, "error": f"{type(e).__name__}: {e}"})
+            return
+        elapsed = time.perf_counter() - t0
+        wall = elapsed if wall is None else min(wall, elapsed)
+    rss1 = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # second, traced run for the Python heap peak (tracemalloc slows the first one down)
+    tracemalloc.start()
+    schedule_modules(ads, des, cool, fan_pairs, **kwargs)
+    _, heap_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    queue.put({
+        "status": result["status"],
+        "engine": result["engine"],
+        "wall_time": wall,
+        "heap_peak_kb": heap_peak // 1024,
+        "rss_growth_kb": max(0, rss1 - rss0),
+        "total_done": result["total_done"],
+        "bound": result["bound"],
+        "intervals": len(result["intervals"]),
+        "violations": len(validate(result)),
+    })
+
+
+def run_case(case, timeout, time_limit, repeat=1):
+    ctx = multiprocessing.get_context("fork" if hasattr(os, "fork") else "spawn")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_run_case, args=(case, time_limit, repeat, queue))
+    proc.start()
+    proc.join(timeout)
+    if proc.is_alive():
+        proc.kill()
+        proc.join()
+        return {"status": "TIMEOUT", "wall_time": None}
+    if queue.empty():
+        return {"status": "ERROR", "wall_time": None, "exitcode": proc.exitcode}
+    return queue.get()
+
+
+def build_cases(matrix, engines, cpsat_max_cells):
+    sys.path.insert(0, ROOT)
+    from schedule import have_cpsat
+
+    cases = []
+    for engine_case in engines:
+        multi_cycle = ENGINE_CASES[engine_case]["multi_cycle"]
+        for n in matrix["modules"]:
+            # single-cycle engines ignore the horizon and schedule within the summed durations
+            for h in matrix["horizons"] if multi_cycle else [None]:
+                for cap in matrix["capacities"]:
+                    for fans in matrix["fans"]:
+                        case = {"engine_case": engine_case, "modules": n, "horizon": h, "capacity": cap, "fans": fans}
+                        if h is None:
+                            ads, des, cool, _ = make_instance(n, fans)
+                            cells = n * (sum(ads.values()) + sum(des.values()) + sum(cool.values()))
+                        else:
+                            cells = n * h
+                        if engine_case.startswith("cpsat") and not have_cpsat():
+                            case["skip"] = "ortools not installed"
+                        elif engine_case.startswith("cpsat") and cells > cpsat_max_cells:
+                            case["skip"] = f"{cells} cells > --cpsat-max-cells {cpsat_max_cells}"
+                        cases.append(case)
+    return cases
+
+
+def add_gaps(results):
+    """Gap of every multi-cycle case to the CP-SAT best bound of the same instance."""
+    bounds = {}
+    for r in results:
+        if r["engine_case"] == "cpsat" and r.get("bound") is not None:
+            bounds[(r["modules"], r["horizon"], r["capacity"], r["fans"])] = r["bound"]
+    for r in results:
+        bound = bounds.get((r["modules"], r["horizon"], r["capacity"], r["fans"]))
+        if bound and r["engine_case"] != "cpsat-makespan" and r.get("total_done") is not None:
+            r["cpsat_bound"] = bound
+            r["gap"] = round((bound - r["total_done"]) / bound, 4)
+
+
+def compare(results, baseline, tolerance, min_delta):
+    """Return a list of regression messages against a baseline results file."""
+    base = {b["key"]: b for b in baseline["cases"]}
+    greedy_done = {(r["modules"], r["horizon"], r["capacity"], r["fans"]): r.get("total_done")
+                   for r in results if r["engine_case"] == "greedy"}
+    regressions = []
+    for r in results:
+        if r.get("violations"):
+            regressions.append(f"{r['key']}: {r['violations']} constraint violations")
+        if r["engine_case"].startswith("cpsat") and r["status"] not in ("SKIPPED", "OPTIMAL", "FEASIBLE"):
+            regressions.append(f"{r['key']}: CP-SAT status {r['status']}")
+        elif r["engine_case"].startswith("cpsat") and r.get("engine") not in (None, r["engine_case"]):
+            regressions.append(f"{r['key']}: CP-SAT found no solution, answered by {r['engine']}")
+        elif r["engine_case"] == "cpsat" and r.get("total_done") == 0:
+            greedy = greedy_done.get((r["modules"], r["horizon"], r["capacity"], r["fans"]))
+            if greedy:
+                regressions.append(f"{r['key']}: CP-SAT completed 0 cycles, greedy {greedy}")
+        b = base.get(r["key"])
+        if not b or r.get("wall_time") is None:
+            continue
+        if b.get("wall_time") is not None:
+            delta = r["wall_time"] - b["wall_time"]
+            if delta > min_delta and r["wall_time"] > b["wall_time"] * (1 + tolerance):
+                regressions.append(f"{r['key']}: wall time {b['wall_time']:.3f}s -> {r['wall_time']:.3f}s")
+        if b.get("total_done") is not None and r.get("total_done", 0) < b["total_done"]:
+            regressions.append(f"{r['key']}: cycles {b['total_done']} -> {r['total_done']}")
+    return regressions
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark the scheduling engines over a parameter matrix.")
+    ap.add_argument("--matrix", choices=sorted(MATRICES), default="quick")
+    ap.add_argument("--engines", nargs="+", choices=sorted(ENGINE_CASES), default=sorted(ENGINE_CASES))
+    ap.add_argument("-o", "--output", default=None, help="write results JSON here")
+    ap.add_argument("--baseline", default=None, help="flag regressions against this results JSON")
+    ap.add_argument("--save-baseline", default=None, help="write these results as the new baseline")
+    ap.add_argument("--tolerance", type=float, default=0.25, help="allowed relative wall-time growth")
+    ap.add_argument("--min-delta", type=float, default=0.005, help="ignore wall-time growth below this (s)")
+    ap.add_argument("--repeat", type=int, default=3, help="runs per case; the best wall time is kept")
+    ap.add_argument("--timeout", type=float, default=120.0, help="per-case timeout (s)")
+    ap.add_argument("--cpsat-time-limit", type=float, default=10.0, help="CP-SAT max_time_in_seconds")
+    ap.add_argument("--cpsat-max-cells", type=int, default=20_000, help="skip CP-SAT above modules x horizon")
+    args = ap.parse_args(argv)
+
+    # cpsat first so greedy cases can report their gap to its bound
+    engines = sorted(args.engines, key=lambda e: (not e.startswith("cpsat"), e))
+    cases = build_cases(MATRICES[args.matrix], engines, args.cpsat_max_cells)
+    results = []
+    for n, case in enumerate(cases, 1):
+        case["key"] = case_key(case)
+        if "skip" in case:
+            results.append(dict(case, status="SKIPPED", wall_time=None))
+            continue
+        # CP-SAT runs to its time limit, so repeating it only multiplies the cost
+        repeat = 1 if case["engine_case"].startswith("cpsat") else args.repeat
+        measured = run_case(case, args.timeout, args.cpsat_time_limit, repeat)
+        results.append(dict(case, **measured))
+        wall = f"{measured['wall_time']:.3f}s" if measured.get("wall_time") is not None else "-"
+        print(f"[{n}/{len(cases)}] {case['key']}: {measured['status']} {wall} "
+              f"cycles={measured.get('total_done', '-')} violations={measured.get('violations', '-')}",
+              file=sys.stderr)
+    add_gaps(results)
+
+    report = {
+        "meta": {
+            "matrix": args.matrix,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "cpsat_time_limit": args.cpsat_time_limit,
+            "repeat": args.repeat,
+            "seed": SEED,
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "cases": results,
+    }
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(report, fh, indent=1)
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as fh:
+            json.dump(report, fh, indent=1)
+
+    baseline = {"cases": []}  # without one, only violations and CP-SAT failures are flagged
+    if args.baseline:
+        with open(args.baseline) as fh:
+            baseline = json.load(fh)
+    regressions = compare(results, baseline, args.tolerance, args.min_delta)
+    for msg in regressions:
+        print(f"REGRESSION {msg}", file=sys.stderr)
+    if regressions:
+        return 1
+    if args.baseline:
+        print("no regressions against baseline", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
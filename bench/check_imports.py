@@ -0,0 +1,69 @@
+"""
+Import-time report and budget check.
+
+    python bench/check_imports.py                 # report for `import schedule`
+    python bench/check_imports.py batch service   # several modules
+    python bench/check_imports.py --budget 0.5 --top 15
+
+Each module is imported in a fresh interpreter under `python -X importtime`.
+The check fails (exit status 1) if the cumulative import time exceeds the
+budget or if a heavy dependency that should only load on demand is imported.
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# dependencies that must only be imported by the code paths that use them
+LAZY = ("ortools", "matplotlib", "pandas", "numpy")
+DEFAULT_BUDGET = 1.0  # seconds, for greedy-only use
+
+
+def import_profile(module):
+    """
+    Import module in a fresh interpreter under -X importtime.
+    Returns (total_seconds, {imported_module: cumulative_seconds}).
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise SystemExit(f"import {module} failed:\n{proc.stderr}")
+    cumulative = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cum, name = line[len("import time:"):].split("|")
+        try:
+            cumulative[name.strip()] = int(cum) / 1e6
+        except ValueError:
+            continue  # header line
+    return cumulative.get(module, 0.0), cumulative
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Report import time and enforce the cold-start budget.")
+    ap.add_argument("modules", nargs="*", default=["schedule"])
+    ap.add_argument("--budget", type=float, default=DEFAULT_BUDGET, help="seconds allowed per module")
+    ap.add_argument("--top", type=int, default=10, help="slowest imports to list")
+    args = ap.parse_args(argv)
+
+    failed = False
+    for module in args.modules:
+        total, cumulative = import_profile(module)
+        eager = sorted({name.split(".")[0] for name in cumulative} & set(LAZY))
+        ok = total <= args.budget and not eager
+        failed |= not ok
+        print(f"import {module}: {total * 1000:.1f} ms (budget {args.budget * 1000:.0f} ms) {'OK' if ok else 'FAIL'}")
+        if eager:
+            print(f"  eagerly imports: {', '.join(eager)}")
+        for name, secs in sorted(cumulative.items(), key=lambda kv: -kv[1])[:args.top]:
+            print(f"  {secs * 1000:8.1f} ms  {name}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
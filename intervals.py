@@ -0,0 +1,117 @@
+from array import array
+
+# phase <-> small int code used in the phase column
+PHASES = ('A', 'D', 'C')
+PHASE_CODE = {p: n for n, p in enumerate(PHASES)}
+
+# array typecodes per column: 4 + 2 + 4 + 4 + 1 = 15 bytes per interval; module ids are
+# any int32 (batch scenarios name modules freely), cycle indices stay small
+COLUMNS = (("module", "i"), ("cycle", "h"), ("start", "i"), ("end", "i"), ("phase", "b"))
+
+
+class IntervalTable:
+    """
+    Columnar schedule container: one array per column instead of a list of
+    (i, k_or_None, s, e, phase) tuples. Rows are grouped by module (keeping each
+    module's emission order, so A/D/C cycles stay consecutive triples) and
+    offsets[i] gives the (lo, hi) row range of module i.
+    Iterating, indexing and slicing return the usual 5-tuples, so a table can be
+    passed wherever plotted_intervals is expected.
+    """
+
+    def __init__(self, columns, modules, offsets):
+        self.module = columns["module"]
+        self.cycle = columns["cycle"]
+        self.start = columns["start"]
+        self.end = columns["end"]
+        self.phase = columns["phase"]
+        self.modules = modules
+        self.offsets = offsets
+
+    @classmethod
+    def from_records(cls, records):
+        """Build from any iterable of (i, k_or_None, s, e, phase), e.g. iter_greedy()."""
+        groups = {}
+        for (i, k, s, e, typ) in records:
+            g = groups.get(i)
+            if g is None:
+                g = groups[i] = {name: array(code) for name, code in COLUMNS[1:]}
+            g["cycle"].append(-1 if k is None else k)
+            g["start"].append(s)
+            g["end"].append(e)
+            g["phase"].append(PHASE_CODE[typ])
+        columns = {name: array(code) for name, code in COLUMNS}
+        modules = sorted(groups)
+        offsets = {}
+        for i in modules:
+            g = groups.pop(i)
+            lo = len(columns["start"])
+            columns["module"].extend([i] * len(g["start"]))
+            for name, _ in COLUMNS[1:]:
+                columns[name].extend(g[name])
+            offsets[i] = (lo, len(columns["start"]))
+        return cls(columns, modules, offsets)
+
+    def __len__(self):
+        return len(self.start)
+
+    def _row(self, n):
+        k = self.cycle[n]
+        return (self.module[n], None if k < 0 else k, self.start[n], self.end[n], PHASES[self.phase[n]])
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self._row(n) for n in range(*idx.indices(len(self)))]
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError("IntervalTable index out of range")
+        return self._row(idx)
+
+    def __iter__(self):
+        for n in range(len(self)):
+            yield self._row(n)
+
+    @property
+    def nbytes(self):
+        return sum(col.itemsize * len(col) for col in (self.module, self.cycle, self.start, self.end, self.phase))
+
+    def module_slice(self, i):
+        """Return (start, end, phase) array slices for module i (phase as int codes)."""
+        lo, hi = self.offsets.get(i, (0, 0))
+        return self.start[lo:hi], self.end[lo:hi], self.phase[lo:hi]
+
+    def phase_occupancy(self, phase, horizon):
+        """Number of intervals of the given phase active at each tick 0..horizon-1 (requires numpy)."""
+        import numpy as np
+        cols = self.to_numpy()
+        start, end = cols["start"], cols["end"]
+        live = (cols["phase"] == PHASE_CODE[phase]) & (end > 0) & (start < horizon)
+        n = max(0, horizon)
+        # +1 where an interval starts, -1 where it ends, clipped to [0, horizon]; running sum
+        diff = (np.bincount(np.maximum(start[live], 0), minlength=n + 1)
+                - np.bincount(np.minimum(end[live], n), minlength=n + 1))
+        return np.cumsum(diff[:n]).astype(np.int32)
+
+    def utilisation(self, horizon):
+        """
+        Fraction of [0, horizon) each module spends in each phase (requires numpy).
+        Returns {i: {'A': frac, 'D': frac, 'C': frac}}
+        """
+        import numpy as np
+        cols = self.to_numpy()
+        busy = np.clip(np.minimum(cols["end"], horizon) - np.maximum(cols["start"], 0), 0, None)
+        # one bin per (module, phase): modules are sorted, so searchsorted gives each row's module slot
+        slot = np.searchsorted(np.asarray(self.modules), cols["module"]) * len(PHASES) + cols["phase"]
+        totals = np.bincount(slot, weights=busy, minlength=len(self.modules) * len(PHASES))
+        if horizon > 0:
+            totals = totals / horizon
+        else:
+            totals = np.zeros_like(totals)
+        return {i: {p: float(totals[n * len(PHASES) + code]) for code, p in enumerate(PHASES)}
+                for n, i in enumerate(self.modules)}
+
+    def to_numpy(self):
+        """Zero-copy numpy views of each column, typed from COLUMNS (requires numpy)."""
+        import numpy as np
+        return {name: np.frombuffer(getattr(self, name), dtype=np.dtype(code)) for name, code in COLUMNS}
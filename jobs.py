@@ -0,0 +1,152 @@
+"""
+Background scheduling jobs with progress, partial results and cancellation.
+
+    runner = JobRunner(workers=2)
+    job_id = runner.submit(key, analyze, n, horizon)    # analyze(n, horizon, job=<Job>)
+    runner.poll(job_id)      # {"state": "running", "progress": 0.4, "partial": ..., ...}
+    runner.cancel(job_id)    # returns at once; the job stops at its next check
+
+Every job runs on a worker thread and receives its Job as the job= keyword. It
+reports through job.report(fraction, partial, message), passes job.cancel_event
+to schedule_modules(cancel=...) (the greedy packer stops at its next tick,
+CP-SAT through StopSearch) and checks job.cancelled() between solves of a sweep.
+A cancelled job is marked so immediately and whatever it returns is discarded.
+
+Finished results are kept per key (the last `keep` jobs), so submitting the same
+key again returns the finished job instead of solving again. Jobs still queued
+or running are never shared: cancelling one cannot stop another caller's job.
+"""
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_WORKERS = 2
+DEFAULT_KEEP = 64
+
+# queued -> running -> done | failed; queued or running -> cancelled
+ACTIVE_STATES = ("queued", "running")
+
+
+class Job:
+    def __init__(self, job_id, key):
+        self.id = job_id
+        self.key = key
+        self.state = "queued"
+        self.progress = 0.0
+        self.partial = None
+        self.message = ""
+        self.result = None
+        self.error = None
+        self.stats = []  # new_stats() records of the solves this job ran, if instrumented
+        self.cancel_event = threading.Event()
+        self.submitted = time.time()
+        self.finished = None
+
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    def report(self, fraction=None, partial=None, message=None):
+        """Progress update from the job's own thread; fraction is 0..1 of the work done."""
+        if fraction is not None:
+            self.progress = max(0.0, min(1.0, fraction))
+        if partial is not None:
+            self.partial = partial
+        if message is not None:
+            self.message = message
+
+    def snapshot(self):
+        return {
+            "id": self.id,
+            "state": self.state,
+            "progress": self.progress,
+            "partial": self.partial,
+            "message": self.message,
+            "result": self.result,
+            "error": self.error,
+            "stats": list(self.stats),
+            "elapsed": (self.finished or time.time()) - self.submitted,
+        }
+
+
+class JobRunner:
+    def __init__(self, workers=DEFAULT_WORKERS, keep=DEFAULT_KEEP):
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scheduler-job")
+        self.keep = keep
+        self.jobs = OrderedDict()
+        self.done_by_key = {}
+        self.lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def submit(self, key, fn, *args, **kwargs):
+        """
+        Run fn(*args, job=<Job>, **kwargs) in the background; returns the job id.
+        key (hashable, or None) identifies the computation: a finished job with the same
+        key is returned instead of running fn again.
+        """
+        with self.lock:
+            job_id = self.done_by_key.get(key) if key is not None else None
+            if job_id in self.jobs:
+                self.jobs.move_to_end(job_id)
+                return job_id
+            job = Job(next(self._ids), key)
+            self.jobs[job.id] = job
+            self._trim()
+        self.pool.submit(self._run, job, fn, args, kwargs)
+        return job.id
+
+    def _run(self, job, fn, args, kwargs):
+        with self.lock:
+            if job.state != "queued":
+                return  # cancelled before a worker picked it up
+            job.state = "running"
+        try:
+            result = fn(*args, job=job, **kwargs)
+        except Exception as e:
+            result, error = None, f"{type(e).__name__}: {e}"
+        else:
+            error = None
+        with self.lock:
+            job.finished = time.time()
+            if job.state != "running":
+                return  # cancelled meanwhile: the caller has moved on
+            if error is None:
+                job.state, job.result, job.progress = "done", result, 1.0
+                if job.key is not None:
+                    self.done_by_key[job.key] = job.id
+            else:
+                job.state, job.error = "failed", error
+
+    def _trim(self):
+        """Forget the oldest finished jobs beyond keep (caller holds the lock)."""
+        finished = [job_id for job_id, job in self.jobs.items() if job.state not in ACTIVE_STATES]
+        for job_id in finished[:max(0, len(finished) - self.keep)]:
+            job = self.jobs.pop(job_id)
+            if self.done_by_key.get(job.key) == job_id:
+                del self.done_by_key[job.key]
+
+    def poll(self, job_id):
+        """Snapshot dict of the job (see Job.snapshot()), or None if it is unknown or forgotten."""
+        with self.lock:
+            job = self.jobs.get(job_id)
+            return job.snapshot() if job is not None else None
+
+    def cancel(self, job_id):
+        """Cancel a queued or running job; returns True if it was still active."""
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None or job.state not in ACTIVE_STATES:
+                return False
+            job.cancel_event.set()
+            job.state = "cancelled"
+            job.finished = time.time()
+            return True
+
+    def shutdown(self):
+        """Cancel every active job and stop the worker threads once they return."""
+        with self.lock:
+            active = [job_id for job_id, job in self.jobs.items() if job.state in ACTIVE_STATES]
+        for job_id in active:
+            self.cancel(job_id)
+        self.pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,181 @@
+import time
+
+from schedule import _book, _engine_result, _finish_result, cpsat_cycles, cycle_upper_bound, fallback_greedy
+
+
+def _cycles(plotted_intervals):
+    """
+    Split plotted_intervals into cycles. Every engine appends a cycle as three
+    consecutive records in A, D, C order, so cycles are the consecutive triples.
+    """
+    return [list(plotted_intervals[j:j + 3]) for j in range(0, len(plotted_intervals), 3)]
+
+
+def apply_event(problem, event):
+    """
+    Apply one change event to a copy of result["problem"]:
+      {"type": "offline", "module": i}
+      {"type": "online", "module": i}
+      {"type": "duration", "module": i, "phase": "A"|"D"|"C", "value": minutes}
+      {"type": "capacity", "resource": "desorption"|"cooling", "value": n}
+    """
+    problem = dict(problem)
+    problem["offline"] = list(problem.get("offline", []))
+    kind = event["type"]
+    if kind == "offline":
+        if event["module"] not in problem["offline"]:
+            problem["offline"].append(event["module"])
+    elif kind == "online":
+        problem["offline"] = [m for m in problem["offline"] if m != event["module"]]
+    elif kind == "duration":
+        key = {"A": "ads_dur", "D": "des_dur", "C": "cool_dur"}[event["phase"]]
+        problem[key] = dict(problem[key])
+        problem[key][event["module"]] = int(event["value"])
+    elif kind == "capacity":
+        key = {"desorption": "desorption_capacity", "cooling": "cooling_capacity"}[event["resource"]]
+        problem[key] = int(event["value"])
+    else:
+        raise ValueError(f"Unknown event type {kind!r}")
+    return problem
+
+
+def _freeze(plotted_intervals, now, events, des_cap, cool_cap):
+    """
+    Keep every cycle whose adsorption started before now; cycles that have not
+    started are dropped and re-planned. Started cycles are adjusted for the events:
+    an offline module's started cycle is aborted (its running phase is cut at now and
+    its remaining phases dropped); a duration change stretches the affected phase if it
+    is still running. Phases of a started cycle that begin at or after now are not
+    kept as planned: they are placed again, with any new duration, at the earliest
+    start from their planned one where the cycle's previous phase has ended and
+    des_cap / cool_cap are not exceeded, in order of planned start.
+    Returns (frozen_intervals, aborted_intervals); aborted cycles lie entirely before
+    now, so they are kept apart and frozen_intervals stays a list of whole cycles.
+    """
+    offline = {ev["module"] for ev in events if ev["type"] == "offline"}
+    new_len = {}
+    for ev in events:
+        if ev["type"] == "duration":
+            new_len[(ev["module"], ev["phase"])] = int(ev["value"])
+
+    kept = []
+    tails = []
+    aborted = []
+    for cycle in _cycles(plotted_intervals):
+        if cycle[0][2] >= now:
+            continue
+        i = cycle[0][0]
+        if i in offline and cycle[-1][3] > now:
+            aborted.extend((m, k, s, min(e, now), typ) for (m, k, s, e, typ) in cycle if s < now)
+            continue
+        past = []
+        for (m, k, s, e, typ) in cycle:
+            if s < now:
+                if (m, typ) in new_len and e > now:
+                    e = max(now, s + new_len[(m, typ)])
+                past.append((m, k, s, e, typ))
+            else:
+                tails.append((s, len(kept), (m, k, new_len.get((m, typ), e - s), typ)))
+        kept.append(past)
+
+    # usage of desorption/cooling from now on: phases already running, then each placed tail phase
+    latest = max([now] + [rec[3] for past in kept for rec in past] + [t[0] for t in tails])
+    span = latest + sum(t[2][2] for t in tails) + 1
+    booking = {'D': ([0] * span, bytearray(span), des_cap), 'C': ([0] * span, bytearray(span), cool_cap)}
+    for past in kept:
+        for (_, _, s, e, typ) in past:
+            if typ in booking and e > now:
+                _book(*booking[typ], max(s, now), e, 1)
+    for planned, n, (m, k, length, typ) in sorted(tails, key=lambda t: (t[0], t[1])):
+        t = max(planned, kept[n][-1][3])
+        count, full, cap = booking[typ]
+        busy = full.find(1, t, t + length)
+        while busy >= 0:
+            t = busy + 1
+            busy = full.find(1, t, t + length)
+        _book(count, full, cap, t, t + length, 1)
+        kept[n].append((m, k, t, t + length, typ))
+    return [rec for past in kept for rec in past], aborted
+
+
+def reschedule(result, now, events, engine="auto", time_limit=None):
+    """
+    Repair an existing multi-cycle schedule from time now after one or more change
+    events (see apply_event). Everything before now is frozen; only the future is
+    re-packed with the greedy or CP-SAT engine, so latency scales with horizon - now.
+    result: a schedule_modules(..., return_result=True) result or a previous reschedule() result.
+    engine: "greedy", "cpsat" or "auto" (CP-SAT if the original came from cpsat/hybrid);
+    a CP-SAT repair that finds no solution within time_limit falls back to greedy.
+    Returns a result dict in the schedule_modules format.
+    """
+    if isinstance(events, dict):
+        events = [events]
+    problem = result["problem"]
+    if not problem.get("multi_cycle", True):
+        raise ValueError("reschedule() only repairs multi-cycle schedules")
+    for ev in events:
+        problem = apply_event(problem, ev)
+
+    horizon = result["horizon"]
+    ads_dur, des_dur, cool_dur = problem["ads_dur"], problem["des_dur"], problem["cool_dur"]
+    fan_pairs = problem["fan_pairs"]
+    des_cap, cool_cap = problem["desorption_capacity"], problem["cooling_capacity"]
+    batched_sync = problem.get("batched_sync", False)
+    all_modules = sorted(ads_dur.keys())
+    offline = problem.get("offline", [])
+    M = [i for i in all_modules if i not in offline]
+
+    if engine == "auto":
+        engine = "cpsat" if result["engine"] in ("cpsat", "hybrid") and not batched_sync else "greedy"
+    if engine not in ("greedy", "cpsat"):
+        raise ValueError(f"reschedule() supports the greedy and cpsat engines, not {engine!r}")
+    if engine == "cpsat" and batched_sync:
+        raise ValueError("Engine 'cpsat' does not support batched_sync")
+
+    t_start = time.perf_counter()
+    frozen, aborted = _freeze(result["intervals"], now, events, des_cap, cool_cap)
+
+    # bound: frozen cycles that complete, plus what the remaining window could hold at best
+    frozen_done = sum(1 for cycle in _cycles(frozen) if cycle[2][3] <= horizon)
+    upper_bound = frozen_done
+    if M and now <= horizon:
+        upper_bound += cycle_upper_bound(M, ads_dur, des_dur, cool_dur, fan_pairs, horizon - now, des_cap, cool_cap)
+
+    new_intervals = []
+    status = "FEASIBLE"
+    bound = None
+    if M and now <= horizon:
+        if engine == "cpsat":
+            new_intervals, _, _, status, bound = cpsat_cycles(
+                M, ads_dur, des_dur, cool_dur, fan_pairs, horizon, des_cap, cool_cap,
+                time_limit=time_limit or 10.0, t0=now, frozen=frozen, upper_bound=upper_bound - frozen_done
+            )
+            if status not in ("OPTIMAL", "FEASIBLE"):
+                # no solution within the time limit: re-pack greedily rather than drop the future
+                engine, status = "greedy", "FEASIBLE"
+            else:
+                bound += frozen_done
+        if engine == "greedy":
+            new_intervals, _, _ = fallback_greedy(
+                M, ads_dur, des_dur, cool_dur, fan_pairs, horizon, des_cap, cool_cap, batched_sync,
+                t0=now, frozen=frozen
+            )
+            bound = None
+
+    plotted_intervals = frozen + new_intervals
+    per_module_done = {i: 0 for i in all_modules}
+    total_done = 0
+    for cycle in _cycles(plotted_intervals):
+        if cycle[2][3] <= horizon:
+            per_module_done[cycle[0][0]] += 1
+            total_done += 1
+
+    repaired = _engine_result(engine, all_modules, plotted_intervals, per_module_done, total_done, horizon,
+                              status=status, bound=bound)
+    repaired["runtime"] = time.perf_counter() - t_start
+    _finish_result(repaired, all_modules, ads_dur, des_dur, cool_dur, fan_pairs, des_cap, cool_cap, True,
+                   batched_sync, upper_bound, f"repair from t={now}")
+    repaired["problem"] = problem  # keeps the offline list for the next repair
+    repaired["frozen"] = len(frozen)
+    repaired["aborted_intervals"] = result.get("aborted_intervals", []) + aborted
+    return repaired
@@ -0,0 +1,216 @@
+"""
+Monte-Carlo robustness of a schedule under duration jitter.
+
+    python robustness.py scenario.json --samples 2000 --distribution triangular --spread 0.15 --target 40
+
+Every sample redraws each module's adsorption, desorption and cooling
+durations around their nominal values and re-packs the horizon with the
+greedy engine. The report gives the spread of completed cycles (mean,
+percentiles) and, for a target, the risk of completing fewer cycles.
+Durations are whole minutes, so samples that round to the same durations
+are evaluated once. Distinct draws are spread over a process pool with one
+worker per available CPU by default, and each worker only counts cycles: it
+drains the greedy packer without building intervals or a result dict, and
+shares the fan groups across its draws. A draw costs one greedy packing, so
+the wall time per sample is about that divided by the number of workers.
+"""
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+
+PHASE_KEYS = {"A": "ads_dur", "D": "des_dur", "C": "cool_dur"}
+DEFAULT_PERCENTILES = (5, 25, 50, 75, 95)
+
+
+# each sampler draws one duration around nominal d with relative spread s
+def _normal(rng, d, s):
+    return rng.gauss(d, s * d)
+
+
+def _uniform(rng, d, s):
+    return rng.uniform(d * (1 - s), d * (1 + s))
+
+
+def _triangular(rng, d, s):
+    return rng.triangular(d * (1 - s), d * (1 + s), d)
+
+
+def _lognormal(rng, d, s):
+    # median d; s is the standard deviation of log(duration)
+    return d * rng.lognormvariate(0.0, s)
+
+
+DISTRIBUTIONS = {
+    "normal": _normal,
+    "uniform": _uniform,
+    "triangular": _triangular,
+    "lognormal": _lognormal,
+}
+
+
+def sample_durations(durations, distribution="normal", spread=0.1, samples=1000, seed=0):
+    """
+    Draw jittered durations for every module and phase.
+    durations: {"A": {module: minutes}, "D": {...}, "C": {...}}
+    distribution / spread: a DISTRIBUTIONS name and a relative spread, either one value
+    for all phases or a {phase: value} mapping (missing phases keep their nominal value).
+    Returns a list of samples, each a tuple of (ads, des, cool) tuples in module order,
+    rounded to whole minutes of at least 1.
+    """
+    if distribution not in DISTRIBUTIONS:
+        raise ValueError(f"Unknown distribution {distribution!r}; expected one of {sorted(DISTRIBUTIONS)}")
+    draw = DISTRIBUTIONS[distribution]
+    spreads = spread if isinstance(spread, dict) else {p: spread for p in PHASE_KEYS}
+    rng = random.Random(seed)
+    M = sorted(durations["A"])
+    columns = []
+    for phase in ("A", "D", "C"):
+        s = spreads.get(phase, 0.0)
+        for i in M:
+            d = durations[phase][i]
+            if s <= 0:
+                columns.append([d] * samples)
+            else:
+                columns.append([max(1, int(round(draw(rng, d, s)))) for _ in range(samples)])
+    n = len(M)
+    return [
+        (tuple(col[k] for col in columns[:n]), tuple(col[k] for col in columns[n:2 * n]),
+         tuple(col[k] for col in columns[2 * n:]))
+        for k in range(samples)
+    ]
+
+
+def default_workers():
+    """Number of CPUs this process may run on (at least 1)."""
+    if hasattr(os, "sched_getaffinity"):
+        return max(1, len(os.sched_getaffinity(0)))
+    return os.cpu_count() or 1
+
+
+def _evaluate(M, fan_pairs, horizon, des_cap, cool_cap, batched_sync, keys):
+    """Completed cycles of the greedy schedule for each (ads, des, cool) duration key."""
+    from schedule import fan_groups, iter_greedy
+
+    # jitter only changes durations, so the fan groups hold for every key
+    groups = fan_groups(M, fan_pairs)
+    totals = []
+    for ads, des, cool in keys:
+        per_module_done = {}
+        # only the cycle counts are needed: drain the generator without keeping intervals
+        deque(iter_greedy(M, dict(zip(M, ads)), dict(zip(M, des)), dict(zip(M, cool)), fan_pairs, horizon,
+                          des_cap, cool_cap, batched_sync, per_module_done=per_module_done, groups=groups),
+              maxlen=0)
+        totals.append(sum(per_module_done.values()))
+    return totals
+
+
+def percentile(sorted_values, q):
+    """q-th percentile (0..100) of an ascending list, linearly interpolated."""
+    if not sorted_values:
+        return None
+    pos = (len(sorted_values) - 1) * q / 100.0
+    lo = int(math.floor(pos))
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (pos - lo)
+
+
+def robustness(ads_dur, des_dur, cool_dur, fan_pairs, horizon,
+               desorption_capacity=2, cooling_capacity=2, batched_sync=False,
+               distribution="normal", spread=0.1, samples=1000, target=None,
+               seed=0, workers=None, percentiles=DEFAULT_PERCENTILES):
+    """
+    Throughput of the greedy multi-cycle schedule over `samples` jittered draws of
+    the durations (see sample_durations). Distinct draws are evaluated in a pool of
+    `workers` processes (default: default_workers()); workers=1 evaluates them in-process.
+    Returns a report dict: nominal, mean, std, min, max, percentiles {q: cycles},
+    risk (share of samples below target, None without a target), samples,
+    evaluated (distinct draws actually scheduled), workers, runtime and histogram {cycles: count}.
+    """
+    if samples < 1:
+        raise ValueError("samples must be at least 1")
+    t_start = time.perf_counter()
+    if workers is None:
+        workers = default_workers()
+    M = sorted(ads_dur.keys())
+    args = (M, list(fan_pairs), horizon, desorption_capacity, cooling_capacity, batched_sync)
+
+    draws = sample_durations({"A": ads_dur, "D": des_dur, "C": cool_dur}, distribution, spread, samples, seed)
+    counts = Counter(draws)
+    nominal = (tuple(ads_dur[i] for i in M), tuple(des_dur[i] for i in M), tuple(cool_dur[i] for i in M))
+    keys = list(counts)
+    if nominal not in counts:
+        keys.append(nominal)
+
+    if workers > 1 and len(keys) > workers:
+        chunk = -(-len(keys) // (workers * 4))
+        chunks = [keys[j:j + chunk] for j in range(0, len(keys), chunk)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = pool.map(_evaluate, *zip(*[args + (c,) for c in chunks]))
+            totals = [total for part in results for total in part]
+    else:
+        totals = _evaluate(*args, keys)
+    by_key = dict(zip(keys, totals))
+
+    values = sorted(v for key, n in counts.items() for v in [by_key[key]] * n)
+    mean = sum(values) / len(values)
+    std = math.sqrt(sum((v - mean) ** 2 for v in values) / len(values))
+    return {
+        "nominal": by_key[nominal],
+        "mean": mean,
+        "std": std,
+        "min": values[0],
+        "max": values[-1],
+        "percentiles": {q: percentile(values, q) for q in percentiles},
+        "target": target,
+        "risk": sum(1 for v in values if v < target) / len(values) if target is not None else None,
+        "samples": samples,
+        "evaluated": len(keys),
+        "workers": workers,
+        "distribution": distribution,
+        "spread": spread,
+        "runtime": time.perf_counter() - t_start,
+        "histogram": dict(sorted(Counter(values).items())),
+    }
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Monte-Carlo throughput of a scenario under duration jitter.")
+    ap.add_argument("scenario", help="one scenario as JSON (see batch.py), or - for stdin")
+    ap.add_argument("--samples", type=int, default=1000)
+    ap.add_argument("--distribution", choices=sorted(DISTRIBUTIONS), default="normal")
+    ap.add_argument("--spread", type=float, default=0.1, help="relative spread of every phase duration")
+    ap.add_argument("--target", type=int, default=None, help="report the risk of completing fewer cycles")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("-j", "--workers", type=int, default=None, help="worker processes (default: one per CPU)")
+    args = ap.parse_args(argv)
+
+    from batch import normalize_scenario
+    try:
+        if args.scenario == "-":
+            raw = json.load(sys.stdin)
+        else:
+            with open(args.scenario) as fh:
+                raw = json.load(fh)
+        scn = normalize_scenario(raw, 0)
+    except (OSError, ValueError, KeyError) as e:
+        raise SystemExit(f"Could not read scenario: {e}")
+    horizon = scn.get("fixed_makespan") or scn.get("plot_horizon") or 24
+
+    report = robustness(
+        scn["ads_dur"], scn["des_dur"], scn["cool_dur"], scn["fan_pairs"], horizon,
+        scn.get("desorption_capacity", 2), scn.get("cooling_capacity", 2), scn.get("batched_sync", False),
+        args.distribution, args.spread, args.samples, args.target, args.seed, args.workers,
+    )
+    json.dump(report, sys.stdout, indent=1)
+    print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,281 +1,443 @@
 # pip install ortools matplotlib
-from ortools.sat.python import cp_model
+import importlib.util
+import time
+from collections import deque
 
-def fallback_greedy(M, ads_dur, des_dur, cool_dur, fan_pairs, horizon, des_cap, cool_cap, batched_sync=False):
+# ortools and matplotlib are imported inside the CP-SAT engines and render_gantt,
+# so greedy-only use (and every worker process) skips their import cost
+from intervals import PHASES, IntervalTable
+
+# hot-path counters collected when a stats dict is passed (see new_stats())
+COUNTERS = ("ticks", "candidates", "capacity_checks", "batches")
+
+
+def new_stats():
+    """Empty instrumentation record: event counters plus seconds spent per stage."""
+    return {"counters": dict.fromkeys(COUNTERS, 0), "timers": {}}
+
+
+def _add_time(stats, stage, seconds):
+    stats["timers"][stage] = stats["timers"].get(stage, 0.0) + seconds
+
+
+def fan_groups(M, fan_pairs):
+    """
+    Union-find over fan_pairs: modules linked by any chain of pairs share one fan,
+    so (1,2),(3,4),(2,3) is a single group.
+    Returns (group_of, groups): group_of[i] is a dense group index 0..G-1 and groups[g]
+    lists its modules, those of M first in M order, then any paired module outside M.
+    """
+    parent = {i: i for i in M}
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for a, b in fan_pairs:
+        parent.setdefault(a, a)
+        parent.setdefault(b, b)
+        ra, rb = find(a), find(b)
+        if ra != rb:
+            parent[rb] = ra
+    group_of = {}
+    groups = []
+    index = {}
+    for i in parent:  # insertion order: M, then pair members outside M
+        root = find(i)
+        if root not in index:
+            index[root] = len(groups)
+            groups.append([])
+        group_of[i] = index[root]
+        groups[index[root]].append(i)
+    return group_of, groups
+
+
+def fallback_greedy(M, ads_dur, des_dur, cool_dur, fan_pairs, horizon, des_cap, cool_cap, batched_sync=False,
+                    t0=0, frozen=None, stats=None, groups=None, cancel=None, progress=None):
     """
     Greedy multi-cycle packer.
     If batched_sync=True: for a given batch start time t, desorption starts at t for every module in the batch,
-    and cooling starts at the same common time tC = t + max_des_in_batch (so A->D->C order is preserved).
-    Returns (plotted_intervals, per_module_done, total_done)
+    and cooling starts at the same common time tC = t + max_des_in_batch (so A->D->C order is preserved),
+    or at t + max_des_among_candidates if cooling capacity is only free there.
+    t0/frozen: only place new phases at or after t0; frozen is a list of already committed
+    (i, k, s, e, phase) intervals whose fan / capacity usage is reserved up front.
+    stats: optional dict from new_stats(); greedy counters and per-stage timers are added to it.
+    groups: optional fan_groups(M, fan_pairs) result, so callers solving several variants of
+    one problem compute it once.
+    cancel: optional threading.Event; packing stops at the next tick once it is set, leaving
+    the cycles placed so far. progress: optional callable(fraction, total_done), called as
+    packing advances through the horizon.
+    Returns (plotted_intervals, per_module_done, total_done) for the newly placed cycles only.
+    """
+    per_module_done = {i: 0 for i in M}
+    plotted_intervals = list(iter_greedy(M, ads_dur, des_dur, cool_dur, fan_pairs, horizon, des_cap, cool_cap,
+                                         batched_sync, t0, frozen, per_module_done, stats, groups,
+                                         cancel, progress))
+    return plotted_intervals, per_module_done, sum(per_module_done.values())
+
+
+def iter_greedy(M, ads_dur, des_dur, cool_dur, fan_pairs, horizon, des_cap, cool_cap, batched_sync=False,
+                t0=0, frozen=None, per_module_done=None, stats=None, groups=None, cancel=None, progress=None):
+    """
+    Streaming form of fallback_greedy: yields each (i, None, s, e, phase) interval as soon
+    as its batch is committed, without keeping the interval list in memory.
+    per_module_done: optional dict updated in place with completed cycles per module,
+    so counters can be read between yields.
+    stats: as for fallback_greedy; added when the generator finishes or is closed.
+    groups, cancel, progress: as for fallback_greedy.
     """
     max_cycle_len = max(ads_dur[i] + des_dur[i] + cool_dur[i] for i in M)
     ext_horizon = horizon + max_cycle_len
+    min_des = min(des_dur[i] for i in M)
+    min_cool = min(cool_dur[i] for i in M)
 
-    # build module->fan mapping (modules that share a fan get same fan id)
-    fan_of = {}
-    next_fan = 0
-    for a, b in fan_pairs:
-        if a not in fan_of and b not in fan_of:
-            fid = next_fan; next_fan += 1
-            fan_of[a] = fid; fan_of[b] = fid
-        else:
-            if a in fan_of:
-                fan_of[b] = fan_of[a]
-            elif b in fan_of:
-                fan_of[a] = fan_of[b]
-    for m in M:
-        if m not in fan_of:
-            fan_of[m] = next_fan; next_fan += 1
-
-    # occupancy trackers over discrete time 0..ext_horizon-1
-    fan_occ = {fid: [False] * ext_horizon for fid in set(fan_of.values())}
+    # modules linked by any chain of fan pairs share one fan; one occupancy bytearray per group
+    group_of, groups = groups or fan_groups(M, fan_pairs)
+    fan_occ = [bytearray(ext_horizon) for _ in groups]
     des_count = [0] * ext_horizon
     cool_count = [0] * ext_horizon
 
-    plotted_intervals = []
-    per_module_done = {i: 0 for i in M}
-    total_done = 0
+    # reserve resources used by the committed past
+    for (i, _k, s, e, typ) in (frozen or ()):
+        lo, hi = max(0, s), min(e, ext_horizon)
+        if typ == 'A':
+            if i in group_of and hi > lo:
+                fan_occ[group_of[i]][lo:hi] = b"\x01" * (hi - lo)
+        elif typ == 'D':
+            for idx in range(lo, hi):
+                des_count[idx] += 1
+        else:
+            for idx in range(lo, hi):
+                cool_count[idx] += 1
+    # slots with no desorption / cooling capacity left, so a window check is one bytearray.find()
+    if frozen:
+        des_full = bytearray(c >= des_cap for c in des_count)
+        cool_full = bytearray(c >= cool_cap for c in cool_count)
+    else:
+        des_full = bytearray(b"\x01" if des_cap <= 0 else b"\x00") * ext_horizon
+        cool_full = bytearray(b"\x01" if cool_cap <= 0 else b"\x00") * ext_horizon
 
-    t = 0
-    while t <= horizon:
-        # build candidate list: modules whose adsorption could end at t (sA = t - a_len >= 0) and fan A window free
-        # Candidates: any module whose adsorption can finish by t.
-        # Find an earliest feasible adsorption start sA (0..t-a_len) where the fan is free.
-        candidates = []
-        for i in M:
-            a_len = ads_dur[i]
-            latest_sA = t - a_len
-            if latest_sA < 0:
-                continue
-            fid = fan_of[i]
-            found_sA = None
-            # try earliest possible start so we pack tightly and free fans sooner
-            for sA_try in range(0, latest_sA + 1):
-                ok = True
-                for dt in range(a_len):
-                    if fan_occ[fid][sA_try + dt]:
-                        ok = False
-                        break
-                if ok:
-                    found_sA = sA_try
+    if per_module_done is None:
+        per_module_done = {}
+    for i in M:
+        per_module_done.setdefault(i, 0)
+
+    # earliest adsorption start whose window is free on the module's fan. Fan occupancy only
+    # grows, so it never moves back and only needs re-checking after a commit on that fan.
+    free_sA = {i: t0 for i in M}
+    stale = set(M)
+
+    # counters are plain locals flushed into stats at the end; the clock only runs when stats is given
+    timed = stats is not None
+    clock = time.perf_counter
+    n_ticks = n_candidates = n_checks = n_batches = 0
+    search_time = check_time = commit_time = 0.0
+    # progress is reported about every 1% of the horizon
+    total_done = sum(per_module_done[i] for i in M)
+    report_step = max(1, (horizon - t0) // 100)
+    next_report = t0 + report_step
+    try:
+        t = t0
+        while t <= horizon:
+            if cancel is not None and cancel.is_set():
+                break
+            if progress is not None and t >= next_report:
+                progress((t - t0) / max(1, horizon - t0), total_done)
+                next_report = t + report_step
+            n_ticks += 1
+            # every module's desorption would start at t: no room there means no batch at this
+            # tick, so jump to the next tick with a free desorption slot
+            if min_des > 0 and des_full[t]:
+                t = des_full.find(0, t + 1, horizon + 1)
+                if t < 0:
                     break
-            if found_sA is None:
                 continue
-            candidates.append((i, found_sA))
+            if timed:
+                tick0 = clock()
 
-        if not candidates:
-            t += 1
-            continue
+            for i in stale:
+                if i not in free_sA:
+                    continue  # fan shared with a module outside M (e.g. offline while rescheduling)
+                occ = fan_occ[group_of[i]]
+                a_len = ads_dur[i]
+                sA = free_sA[i]
+                while True:
+                    busy = occ.rfind(1, sA, sA + a_len)
+                    if busy < 0:
+                        break
+                    sA = busy + 1
+                free_sA[i] = sA
+            stale.clear()
 
-        # For batched_sync we will synchronize cooling start at tC = t + max_des_among_candidates
-        if batched_sync:
-            max_des_cand = max(des_dur[i] for (i, _) in candidates)
-            tC = t + max_des_cand
-        else:
-            tC = None
-
-        # Greedily pick a batch from candidates while respecting combined capacities
-        batch = []
-        inc_des = [0] * ext_horizon
-        inc_cool = [0] * ext_horizon
-
-        # sort candidates by earliest adsorption start then by fewest completed cycles to improve fairness
-        for (i, sA) in sorted(candidates, key=lambda x: (x[1], per_module_done.get(x[0], 0), x[0])):
-            d_len = des_dur[i]
-            c_len = cool_dur[i]
-
-            # check des capacity if added starting at t
-            can_add = True
-            for dt in range(d_len):
-                idx = t + dt
-                if idx >= ext_horizon or des_count[idx] + inc_des[idx] + 1 > des_cap:
-                    can_add = False
-                    break
-            if not can_add:
+            # candidates: modules whose earliest free adsorption window ends by t, as
+            # (sA, completed cycles, module) so sorting needs no key function
+            candidates = [(free_sA[i], per_module_done[i], i) for i in M if free_sA[i] + ads_dur[i] <= t]
+            n_candidates += len(candidates)
+            if timed:
+                tick1 = clock()
+                search_time += tick1 - tick0
+
+            if not candidates:
+                # nothing changes until the next module's adsorption window can end
+                t = max(t + 1, min(free_sA[i] + ads_dur[i] for i in M))
                 continue
 
-            # check cooling: if batched_sync use tC, else cooling would start at t + d_len (module-specific)
+            # For batched_sync we will synchronize cooling start at tC = t + max_des_among_candidates
             if batched_sync:
-                for dt in range(c_len):
-                    idx = tC + dt
-                    if idx >= ext_horizon or cool_count[idx] + inc_cool[idx] + 1 > cool_cap:
-                        can_add = False
-                        break
+                max_des_cand = max(des_dur[i] for (_, _, i) in candidates)
+                tC = t + max_des_cand
             else:
-                tC_mod = t + d_len
-                for dt in range(c_len):
-                    idx = tC_mod + dt
-                    if idx >= ext_horizon or cool_count[idx] + inc_cool[idx] + 1 > cool_cap:
-                        can_add = False
-                        break
-            if not can_add:
-                continue
+                tC = None
 
-            # ensure fan adsorption window still okay (no conflict with existing occupancy or with already-accepted batch members)
-            fid = fan_of[i]
-            ok_fan = True
-            # check against global occupancy
-            for dt in range(ads_dur[i]):
-                if fan_occ[fid][sA + dt]:
-                    ok_fan = False
-                    break
-            if not ok_fan:
-                continue
-            # check against already-accepted batch members (avoid double-using same fan overlap inside this batch)
-            for (other_i, other_sA) in batch:
-                if fan_of[other_i] != fid:
+            # Greedily pick a batch from candidates while respecting combined capacities.
+            # Accepted members book their desorption and cooling right away, so later
+            # candidates are checked against the counts including the batch so far.
+            # des_room: free desorption slots from t; cool_room: free cooling slots from the shared tC
+            batch = []
+            batch_windows = {}
+            des_room = _room(des_full, t, ext_horizon)
+            cool_room = _room(cool_full, tC, ext_horizon) if batched_sync else None
+
+            # sort candidates by earliest adsorption start then by fewest completed cycles to improve fairness
+            candidates.sort()
+            for (sA, _, i) in candidates:
+                if des_room < min_des or (batched_sync and cool_room < min_cool):
+                    break  # nobody else fits in what is left at this tick
+                n_checks += 1
+                d_len = des_dur[i]
+                c_len = cool_dur[i]
+
+                # check des capacity if added starting at t
+                if d_len > des_room:
                     continue
-                # if windows [sA, sA+len) and [other_sA, other_sA+len_other) overlap -> conflict
-                len_other = ads_dur[other_i]
-                if not (sA + ads_dur[i] <= other_sA or other_sA + len_other <= sA):
-                    ok_fan = False
-                    break
-            if not ok_fan:
+
+                # check cooling: if batched_sync use tC, else cooling would start at t + d_len (module-specific)
+                if batched_sync:
+                    tC_mod = tC
+                    if c_len > cool_room:
+                        continue
+                else:
+                    tC_mod = t + d_len
+                    if tC_mod + c_len > ext_horizon or cool_full.find(1, tC_mod, tC_mod + c_len) >= 0:
+                        continue
+
+                # the window is free on the fan itself; it must not overlap a batch member on the same fan
+                g = group_of[i]
+                eA = sA + ads_dur[i]
+                if any(sA < other_eA and other_sA < eA for other_sA, other_eA in batch_windows.get(g, ())):
+                    continue
+
+                # accept module
+                batch.append((i, sA))
+                batch_windows.setdefault(g, []).append((sA, eA))
+                _book(des_count, des_full, des_cap, t, t + d_len, 1)
+                _book(cool_count, cool_full, cool_cap, tC_mod, tC_mod + c_len, 1)
+                des_room = _room(des_full, t, ext_horizon)
+                if batched_sync:
+                    cool_room = _room(cool_full, tC, ext_horizon)
+
+            if timed:
+                tick2 = clock()
+                check_time += tick2 - tick1
+            if not batch:
+                if batched_sync:
+                    t += 1
+                    continue
+                # nothing was booked, so no batch forms before some candidate's own desorption
+                # and cooling windows come free or another module's adsorption window can end
+                t_next = min((free_sA[i] + ads_dur[i] for i in M if free_sA[i] + ads_dur[i] > t),
+                             default=horizon + 1)
+                for (_, _, i) in candidates:
+                    t_next = _next_fit(des_full, cool_full, t + 1, des_dur[i], cool_dur[i], t_next)
+                t = t_next
                 continue
+            n_batches += 1
 
-            # accept module
-            batch.append((i, sA))
-            for dt in range(d_len):
-                inc_des[t + dt] += 1
+            # commit batch: mark occupancies and record intervals
+            # recompute tC for committed batch when batched_sync to ensure consistency: cooling
+            # was checked and booked at the candidates' tC, so it only moves to the batch's own
+            # (earlier) tC_batch if every member's cooling still fits there
             if batched_sync:
-                for dt in range(c_len):
-                    inc_cool[tC + dt] += 1
-            else:
-                tC_mod = t + d_len
-                for dt in range(c_len):
-                    inc_cool[tC_mod + dt] += 1
+                max_des_batch = max(des_dur[i] for (i, _) in batch)
+                tC_batch = t + max_des_batch
+                if tC_batch != tC:
+                    for (i, _) in batch:
+                        _book(cool_count, cool_full, cool_cap, tC, tC + cool_dur[i], -1)
+                    moved = []
+                    for (i, _) in batch:
+                        c_len = cool_dur[i]
+                        if cool_full.find(1, tC_batch, tC_batch + c_len) >= 0:
+                            break
+                        _book(cool_count, cool_full, cool_cap, tC_batch, tC_batch + c_len, 1)
+                        moved.append(i)
+                    else:
+                        moved = None
+                    if moved is not None:
+                        for i in moved:
+                            _book(cool_count, cool_full, cool_cap, tC_batch, tC_batch + cool_dur[i], -1)
+                        for (i, _) in batch:
+                            _book(cool_count, cool_full, cool_cap, tC, tC + cool_dur[i], 1)
+                        tC_batch = tC
+            committed = []
+            for (i, sA) in batch:
+                a_len, d_len, c_len = ads_dur[i], des_dur[i], cool_dur[i]
+                g = group_of[i]
+                eA = sA + a_len
+                # mark adsorption occupancy; the fan's other modules must look for a new window
+                fan_occ[g][sA:eA] = b"\x01" * a_len
+                stale.update(groups[g])
+                # des (from t) and cooling were booked already
+                sC = tC_batch if batched_sync else t + d_len
+                committed.append((i, None, sA, eA, 'A'))
+                committed.append((i, None, t, t + d_len, 'D'))
+                committed.append((i, None, sC, sC + c_len, 'C'))
+                if sC + c_len <= horizon:
+                    per_module_done[i] += 1
+                    total_done += 1
 
-        if not batch:
+            if timed:
+                commit_time += clock() - tick2
+            yield from committed
+
+            # advance time to continue packing (move forward one step)
             t += 1
+        if progress is not None and not (cancel is not None and cancel.is_set()):
+            progress(1.0, total_done)
+
+    finally:
+        if timed:
+            counters = stats["counters"]
+            counters["ticks"] += n_ticks
+            counters["candidates"] += n_candidates
+            counters["capacity_checks"] += n_checks
+            counters["batches"] += n_batches
+            _add_time(stats, "candidate_search", search_time)
+            _add_time(stats, "capacity_check", check_time)
+            _add_time(stats, "commit", commit_time)
+
+
+def _next_fit(des_full, cool_full, t, d_len, c_len, limit):
+    """Earliest tick in [t, limit) whose desorption window and the cooling right after it are free, else limit."""
+    while t < limit:
+        # on a clash, jump to where the full stretch it hit ends
+        busy = des_full.find(1, t, t + d_len)
+        if busy >= 0:
+            t = des_full.find(0, busy)
+            if t < 0:
+                return limit
+            continue
+        busy = cool_full.find(1, t + d_len, t + d_len + c_len)
+        if busy >= 0:
+            free = cool_full.find(0, busy)
+            if free < 0:
+                return limit
+            t = free - d_len
             continue
+        return t
+    return limit
 
-        # commit batch: mark occupancies and record intervals
-        # recompute tC for committed batch when batched_sync to ensure consistency
-        if batched_sync:
-            max_des_batch = max(des_dur[i] for (i, _) in batch)
-            tC_batch = t + max_des_batch
-        for (i, sA) in batch:
-            a_len, d_len, c_len = ads_dur[i], des_dur[i], cool_dur[i]
-            fid = fan_of[i]
-            eA = sA + a_len
-            # mark adsorption occupancy
-            for dt in range(a_len):
-                fan_occ[fid][sA + dt] = True
-            # mark des occupancy starting at t
-            for dt in range(d_len):
-                if t + dt < ext_horizon:
-                    des_count[t + dt] += 1
-            # mark cooling occupancy: batched_sync => start at tC_batch, else start at t + d_len
-            if batched_sync:
-                for dt in range(c_len):
-                    idx = tC_batch + dt
-                    if idx < ext_horizon:
-                        cool_count[idx] += 1
-                plotted_intervals.append((i, None, sA, eA, 'A'))
-                plotted_intervals.append((i, None, t, t + d_len, 'D'))
-                plotted_intervals.append((i, None, tC_batch, tC_batch + c_len, 'C'))
-                if tC_batch + c_len <= horizon:
-                    per_module_done[i] += 1
-                    total_done += 1
-            else:
-                tC_mod = t + d_len
-                for dt in range(c_len):
-                    idx = tC_mod + dt
-                    if idx < ext_horizon:
-                        cool_count[idx] += 1
-                plotted_intervals.append((i, None, sA, eA, 'A'))
-                plotted_intervals.append((i, None, t, t + d_len, 'D'))
-                plotted_intervals.append((i, None, tC_mod, tC_mod + c_len, 'C'))
-                if tC_mod + c_len <= horizon:
-                    per_module_done[i] += 1
-                    total_done += 1
 
-        # advance time to continue packing (move forward one step)
-        t += 1
+def _room(full, start, ext_horizon):
+    """Number of consecutive slots with capacity left from start (up to ext_horizon)."""
+    busy = full.find(1, start, ext_horizon)
+    return (busy if busy >= 0 else ext_horizon) - start
 
-    return plotted_intervals, per_module_done, total_done
 
+def _knapsack_count(items, capacity):
+    """Most unit-value items that fit in capacity; items are (weight, copies), lightest taken first."""
+    total = 0
+    for weight, copies in sorted(items):
+        take = copies if weight <= 0 else min(copies, max(0, capacity) // weight)
+        total += take
+        capacity -= take * weight
+        if take < copies:
+            break
+    return total
 
-def schedule_modules(ads_dur, des_dur, cool_dur, fan_pairs,
-                     desorption_capacity=2, cooling_capacity=2,
-                     fixed_makespan=None, plot_horizon=None,
-                     multi_cycle=False, batched_sync=False):
+
+def cycle_upper_bound(M, ads_dur, des_dur, cool_dur, fan_pairs, horizon, des_cap, cool_cap, single_cycle=False,
+                      groups=None):
     """
-    multi_cycle=True uses greedy packer; if batched_sync=True the greedy packer
-    will start D and C at the same common time for each batch.
-    Returns (per_module_done, total_done, png_filename)
+    Upper bound on the cycles any engine can complete within horizon.
+    A completed cycle of module i adsorbs inside [0, H - d_i - c_i], desorbs inside
+    [a_i, H - c_i] and cools inside [a_i + d_i, H], and a module's adsorptions never
+    overlap; that caps each module, and the bound is the smallest of four relaxations:
+    the per-module caps alone, the fan time of every fan group, and the desorption
+    and cooling capacity over their windows, each solved as a unit-value knapsack.
+    single_cycle=True caps every module at one cycle; groups is an optional precomputed
+    fan_groups(M, fan_pairs) result.
     """
-    M = sorted(ads_dur.keys())
+    if not M:
+        return 0
+    caps = {}
+    for i in M:
+        room = horizon - des_dur[i] - cool_dur[i]
+        caps[i] = max(0, room // max(1, ads_dur[i])) if room >= 0 else 0
+        if single_cycle:
+            caps[i] = min(1, caps[i])
 
-    # If multi_cycle requested, use greedy packer (fast, deterministic)
-    if multi_cycle:
-        horizon = fixed_makespan if fixed_makespan is not None else (plot_horizon if plot_horizon is not None else 24)
-        plotted_intervals, per_module_done, total_done = fallback_greedy(
-            M, ads_dur, des_dur, cool_dur, fan_pairs, horizon, desorption_capacity, cooling_capacity, batched_sync
-        )
-        makespan = plot_horizon if plot_horizon is not None else horizon
-        out_fn = "gantt.png"
-        try:
-            import matplotlib.pyplot as plt
-            import matplotlib.patches as mpatches
-            width = max(10, makespan / 6)
-            height = max(3, 1 + len(M) * 0.8)
-            fig, ax = plt.subplots(figsize=(width, height), dpi=180)
-            colors = {"A": "#1f77b4", "D": "#ff7f0e", "C": "#2ca02c"}
-            for yi, i in enumerate(M):
-                intvs = [(rec[2], rec[3], rec[4]) for rec in plotted_intervals if rec[0] == i]
-                for s, e, typ in intvs:
-                    if e <= 0 or s >= makespan:
-                        continue
-                    s_clipped = max(0, s)
-                    dur = max(0, min(e, makespan) - s_clipped)
-                    ax.broken_barh([(s_clipped, dur)], (yi - 0.35, 0.7), facecolors=colors[typ], edgecolor="k", linewidth=0.3)
-            ax.set_yticks(list(range(len(M))))
-            ax.set_yticklabels([f"Module {i}" for i in M], fontsize=12)
-            ax.set_xlabel("Time", fontsize=12)
-            ax.set_xlim(0, makespan)
-            ax.set_ylim(-1, len(M))
-            ax.grid(True, axis="x", linestyle="--", linewidth=0.4, alpha=0.6)
-            patches = [mpatches.Patch(color=colors[k], label={"A": "Adsorption", "D": "Desorption", "C": "Cooling"}[k]) for k in ("A","D","C")]
-            ax.legend(handles=patches, loc='upper right', fontsize=11)
-            ax.set_title("Gantt chart (tiled cycles, batched sync)" if batched_sync else "Gantt chart (tiled cycles)", fontsize=14)
-            plt.tight_layout()
-            plt.savefig(out_fn, dpi=180)
-            plt.close(fig)
-        except Exception:
-            out_fn = None
-
-        return per_module_done, total_done, out_fn
-
-    # Fallback single-cycle behavior kept minimal (not changed here)
-    # Implement a simple single back-to-back cycle per module via greedy packer with horizon= fixed_makespan or sum of durations
-    horizon = fixed_makespan if fixed_makespan is not None else (sum(ads_dur.values()) + sum(des_dur.values()) + sum(cool_dur.values()))
+    fan_bound = 0
+    for group in (groups or fan_groups(M, fan_pairs))[1]:
+        members = [i for i in group if i in caps]
+        if members:
+            window = horizon - min(des_dur[i] + cool_dur[i] for i in members)
+            fan_bound += _knapsack_count([(ads_dur[i], caps[i]) for i in members], window)
+    des_window = horizon - min(ads_dur[i] for i in M) - min(cool_dur[i] for i in M)
+    cool_window = horizon - min(ads_dur[i] + des_dur[i] for i in M)
+    return min(
+        sum(caps.values()),
+        fan_bound,
+        _knapsack_count([(des_dur[i], caps[i]) for i in M], des_cap * des_window),
+        _knapsack_count([(cool_dur[i], caps[i]) for i in M], cool_cap * cool_window),
+    )
+
+
+def _book(count, full, cap, lo, hi, delta):
+    """Add delta to count[lo:hi] and keep the matching full flags in step."""
+    for idx in range(lo, hi):
+        count[idx] += delta
+        full[idx] = count[idx] >= cap
+
+
+def sequential_single(M, ads_dur, des_dur, cool_dur, fan_pairs, horizon, des_cap, cool_cap):
+    """
+    Single back-to-back cycle per module, placed sequentially at the earliest start where
+    adsorptions on a shared fan never overlap and desorption/cooling stay within capacity.
+    Returns (plotted_intervals, per_module_done, total_done)
+    """
     plotted_intervals = []
     per_module_done = {i: 0 for i in M}
     total_done = 0
-    # simple schedule: place modules sequentially without overlapping adsorption on shared fans
-    current = 0
-    # minimal fan mapping
-    fans = {m: None for m in M}
-    fid = 0
-    for a,b in fan_pairs:
-        if fans[a] is None and fans[b] is None:
-            fans[a] = fans[b] = fid; fid += 1
-        else:
-            if fans[a] is None: fans[a] = fans[b]
-            if fans[b] is None: fans[b] = fans[a]
-    for m in M:
-        if fans[m] is None:
-            fans[m] = fid; fid += 1
-    fan_occ = {f: 0 for f in set(fans.values())}
+    fans, groups = fan_groups(M, fan_pairs)
+    fan_occ = [0] * len(groups)
+    # a cycle always fits once every earlier one has finished, so this many ticks suffice
+    span = sum(ads_dur[i] + des_dur[i] + cool_dur[i] for i in M) + 1
+    des_count, des_full = [0] * span, bytearray(span)
+    cool_count, cool_full = [0] * span, bytearray(span)
 
     for i in M:
+        a, d, c = ads_dur[i], des_dur[i], cool_dur[i]
         sA = max(0, fan_occ[fans[i]])
-        eA = sA + ads_dur[i]
+        while True:
+            # jump just past the first full tick of the desorption or cooling window
+            busy = des_full.find(1, sA + a, sA + a + d)
+            if busy >= 0:
+                sA = busy - a + 1
+                continue
+            busy = cool_full.find(1, sA + a + d, sA + a + d + c)
+            if busy >= 0:
+                sA = busy - a - d + 1
+                continue
+            break
+        eA = sA + a
         sD = eA
-        eD = sD + des_dur[i]
+        eD = sD + d
         sC = eD
-        eC = sC + cool_dur[i]
+        eC = sC + c
+        _book(des_count, des_full, des_cap, sD, eD, 1)
+        _book(cool_count, cool_full, cool_cap, sC, eC, 1)
         plotted_intervals.append((i, 0, sA, eA, 'A'))
         plotted_intervals.append((i, 0, sD, eD, 'D'))
         plotted_intervals.append((i, 0, sC, eC, 'C'))
@@ -284,42 +446,783 @@ def schedule_modules(ads_dur, des_dur, cool_dur, fan_pairs,
             per_module_done[i] = 1
             total_done += 1
 
-    out_fn = "gantt.png"
+    return plotted_intervals, per_module_done, total_done
+
+
+def _usage_profile(spans, cap):
+    """Merge (start, end) spans into (start, end, level) segments of constant usage, levels capped at cap."""
+    events = sorted([(s, 1) for s, e in spans] + [(e, -1) for s, e in spans])
+    segments = []
+    level = 0
+    prev = None
+    for t, delta in events:
+        if level > 0 and t > prev:
+            segments.append((prev, t, min(level, cap)))
+        level += delta
+        prev = t
+    return segments
+
+
+def _solve_cpsat(solver, model, cancel=None, progress=None):
+    """
+    solver.Solve(model). progress: optional callable(fraction, objective) called on every
+    improving solution, fraction being the share of the time limit used. cancel: optional
+    threading.Event; the search stops (StopSearch) within 0.1 s of it being set.
+    """
+    if cancel is None and progress is None:
+        return solver.Solve(model)
+    import threading
+    from ortools.sat.python import cp_model
+
+    time_limit = solver.parameters.max_time_in_seconds
+
+    class _Callback(cp_model.CpSolverSolutionCallback):
+        def on_solution_callback(self):
+            if progress is not None:
+                progress(min(1.0, self.WallTime() / time_limit), int(self.ObjectiveValue()))
+
+    callback = _Callback()
+    finished = threading.Event()
+
+    def watch():
+        # the callback only runs when a solution is found, so a cancel between solutions
+        # is noticed here
+        while not finished.wait(0.1):
+            if cancel.is_set():
+                (getattr(solver, "stop_search", None) or callback.StopSearch)()
+                return
+
+    watcher = None
+    if cancel is not None:
+        watcher = threading.Thread(target=watch, name="cpsat-cancel", daemon=True)
+        watcher.start()
+    try:
+        return solver.Solve(model, callback)
+    finally:
+        finished.set()
+        if watcher is not None:
+            watcher.join()
+
+
+def cpsat_cycles(M, ads_dur, des_dur, cool_dur, fan_pairs, horizon, des_cap, cool_cap,
+                 time_limit=20.0, hint=None, t0=0, frozen=None, stats=None, upper_bound=None,
+                 cancel=None, progress=None):
+    """
+    CP-SAT multi-cycle model: each module runs tiled A->D->C cycles and the number of
+    cycles finishing within the horizon is maximized. Tiling is the greedy packer's rule:
+    a module adsorbs for one cycle at a time, and its next adsorption may start as soon as
+    the previous one ends, while that cycle still desorbs and cools. Every greedy schedule
+    is therefore a solution, and OPTIMAL means no engine can complete more cycles.
+    Every cycle is optional, so only completed cycles are returned.
+    hint: optional plotted_intervals (e.g. from the greedy packer) used as a solution hint.
+    t0/frozen: as for fallback_greedy; new cycles start at or after t0 and after the
+    module's last frozen adsorption, and frozen intervals take part in every resource constraint.
+    stats: optional dict from new_stats(); model build and solve times are added to it.
+    upper_bound: optional known bound on the cycles (cycle_upper_bound()); the objective is
+    capped at it so the search can stop as soon as a schedule reaches it.
+    cancel / progress: see _solve_cpsat(); a cancelled search returns its best schedule so far.
+    A search that ends without any solution returns no intervals and status UNKNOWN;
+    an infeasible model raises ValueError.
+    Returns (plotted_intervals, per_module_done, total_done, status, bound)
+    """
+    from ortools.sat.python import cp_model
+
+    build0 = time.perf_counter()
+    model = cp_model.CpModel()
+
+    # committed past: new phases start at or after t0, so only frozen usage from t0 on matters.
+    # Each module can adsorb again once its own frozen adsorptions end.
+    free_at = {i: t0 for i in M}
+    frozen_A = {}
+    frozen_spans = {'D': [], 'C': []}
+    for (i, _k, s, e, typ) in frozen or ():
+        if typ == 'A' and i in free_at:
+            free_at[i] = max(free_at[i], e)
+        s = max(s, t0)
+        if e <= s:
+            continue
+        if typ == 'A':
+            frozen_A.setdefault(i, []).append((s, e))
+        else:
+            frozen_spans[typ].append((s, e))
+
+    # tiled cycles that can still complete after the module is free: adsorptions at least ads_dur
+    # apart, the last one followed by its desorption and cooling. Every cycle is optional (present
+    # only if it completes), so the model is feasible whatever the capacities allow
+    max_cycles = {}
+    for i in M:
+        room = horizon - free_at[i] - des_dur[i] - cool_dur[i]
+        max_cycles[i] = room // max(1, ads_dur[i]) if room >= ads_dur[i] else 0
+
+    sA = {}
+    sD = {}
+    sC = {}
+    endC = {}
+    iA = {}
+    iD = {}
+    iC = {}
+    done = {}
+
+    for i in M:
+        for k in range(max_cycles[i]):
+            key = (i, k)
+            done[key] = model.NewBoolVar(f"done_{i}_{k}")
+            sA[key] = model.NewIntVar(t0, horizon, f"sA_{i}_{k}")
+            sD[key] = model.NewIntVar(t0, horizon, f"sD_{i}_{k}")
+            sC[key] = model.NewIntVar(t0, horizon, f"sC_{i}_{k}")
+            endC[key] = model.NewIntVar(t0, horizon, f"endC_{i}_{k}")
+
+            iA[key] = model.NewOptionalIntervalVar(sA[key], ads_dur[i], sA[key] + ads_dur[i], done[key],
+                                                   f"iA_{i}_{k}")
+            iD[key] = model.NewOptionalIntervalVar(sD[key], des_dur[i], sD[key] + des_dur[i], done[key],
+                                                   f"iD_{i}_{k}")
+            iC[key] = model.NewOptionalIntervalVar(sC[key], cool_dur[i], sC[key] + cool_dur[i], done[key],
+                                                   f"iC_{i}_{k}")
+
+            model.Add(sD[key] >= sA[key] + ads_dur[i])
+            model.Add(sC[key] >= sD[key] + des_dur[i])
+            model.Add(endC[key] == sC[key] + cool_dur[i])
+
+        # completed cycles come first, ordered by adsorption start, and never adsorb at once;
+        # absent ones are left unconstrained
+        for k in range(max_cycles[i] - 1):
+            model.AddImplication(done[(i, k + 1)], done[(i, k)])
+            model.Add(sA[(i, k + 1)] >= sA[(i, k)] + ads_dur[i]).OnlyEnforceIf(done[(i, k + 1)])
+        if max_cycles[i] and free_at[i] > t0:
+            model.Add(sA[(i, 0)] >= free_at[i])
+
+    # one no-overlap per fan group; a module alone on its fan is already sequenced by its cycles
+    for group in fan_groups(M, fan_pairs)[1]:
+        if len(group) < 2:
+            continue
+        spans = [span for m in group for span in frozen_A.get(m, ())]
+        ints = [model.NewFixedSizeIntervalVar(s, e - s, f"frozen_A_{group[0]}_{n}")
+                for n, (s, e, _) in enumerate(_usage_profile(spans, 1))]
+        ints.extend(iA[(m, k)] for m in group for k in range(max_cycles.get(m, 0)))
+        if len(ints) > 1:
+            model.AddNoOverlap(ints)
+
+    # frozen desorptions / coolings enter as a usage profile capped at the capacity, so a
+    # capacity lowered below what is already running blocks new phases instead of making
+    # the model infeasible
+    for typ, ivs, cap in (('D', iD, des_cap), ('C', iC, cool_cap)):
+        ints = [ivs[(i, k)] for i in M for k in range(max_cycles[i])]
+        demands = [1] * len(ints)
+        for n, (s, e, level) in enumerate(_usage_profile(frozen_spans[typ], cap)):
+            ints.append(model.NewFixedSizeIntervalVar(s, e - s, f"frozen_{typ}_{n}"))
+            demands.append(level)
+        if ints:
+            model.AddCumulative(ints, demands, cap)
+
+    # hint: the k-th cycle (by adsorption start) of module i seeds cycle (i, k)
+    if hint:
+        # engines emit each cycle as consecutive A, D, C records; tiled cycles may finish
+        # out of order, so the phases are hinted per cycle rather than sorted per phase
+        by_module = {}
+        records = list(hint)
+        for n in range(0, len(records) - 2, 3):
+            (i, _, s, _, _), (_, _, d, _, _), (_, _, c, e, _) = records[n:n + 3]
+            by_module.setdefault(i, []).append((s, d, c, e))
+        for i in M:
+            for k, (s, d, c, e) in enumerate(sorted(by_module.get(i, []))[:max_cycles[i]]):
+                present = t0 <= s and e <= horizon
+                if present:
+                    model.AddHint(sA[(i, k)], s)
+                    model.AddHint(sD[(i, k)], d)
+                    model.AddHint(sC[(i, k)], c)
+                model.AddHint(done[(i, k)], int(present))
+
+    # most cycles first; among schedules with as many, spread them over the modules (tiling
+    # alone would happily let one module run every cycle while its fan-mate idles)
+    total = sum(done.values())
+    if upper_bound is not None:
+        model.Add(total <= upper_bound)
+    weight = max(max_cycles.values(), default=0) + 1
+    fewest = model.NewIntVar(0, weight - 1, "fewest_cycles")
+    for i in M:
+        model.Add(fewest <= sum(done[(i, k)] for k in range(max_cycles[i])))
+    model.Maximize(weight * total + fewest)
+
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = float(time_limit)
+    solver.parameters.num_search_workers = 8
+    solve0 = time.perf_counter()
+    status = _solve_cpsat(solver, model, cancel, progress)
+    if stats is not None:
+        _add_time(stats, "cpsat_build", solve0 - build0)
+        _add_time(stats, "cpsat_solve", time.perf_counter() - solve0)
+
+    plotted_intervals = []
+    per_module_done = {i: 0 for i in M}
+    total_done = 0
+    bound = None
+    if status in (cp_model.INFEASIBLE, cp_model.MODEL_INVALID):
+        # leaving every cycle out is always a solution, so this is a bug, not an empty schedule
+        raise ValueError(f"CP-SAT multi-cycle model is {solver.StatusName(status)}")
+    if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        bound = int(solver.BestObjectiveBound()) // weight
+        for i in M:
+            for k in range(max_cycles[i]):
+                key = (i, k)
+                if not solver.Value(done[key]):
+                    continue
+                sA_v = solver.Value(sA[key])
+                sD_v = solver.Value(sD[key])
+                sC_v = solver.Value(sC[key])
+                eA = sA_v + ads_dur[i]
+                eD = sD_v + des_dur[i]
+                eC = sC_v + cool_dur[i]
+                per_module_done[i] += 1
+                total_done += 1
+                plotted_intervals.append((i, k, sA_v, eA, 'A'))
+                plotted_intervals.append((i, k, sD_v, eD, 'D'))
+                plotted_intervals.append((i, k, sC_v, eC, 'C'))
+
+    return plotted_intervals, per_module_done, total_done, solver.StatusName(status), bound
+
+
+def cpsat_makespan(M, ads_dur, des_dur, cool_dur, fan_pairs, horizon, des_cap, cool_cap,
+                   time_limit=10.0, fixed_makespan=None, enforce_no_idle_modules=False, stats=None,
+                   cancel=None, progress=None):
+    """
+    CP-SAT single-cycle model: one A->D->C cycle per module, makespan minimized
+    (or pinned to fixed_makespan). stats, cancel, progress: as for cpsat_cycles.
+    Returns (plotted_intervals, per_module_done, total_done, status, makespan)
+    """
+    from ortools.sat.python import cp_model
+
+    build0 = time.perf_counter()
+    model = cp_model.CpModel()
+    sA, sD, sC = {}, {}, {}
+    iA, iD, iC = {}, {}, {}
+    endD, endC = {}, {}
+    for i in M:
+        sA[i] = model.NewIntVar(0, horizon, f"sA_{i}")
+        sD[i] = model.NewIntVar(0, horizon, f"sD_{i}")
+        sC[i] = model.NewIntVar(0, horizon, f"sC_{i}")
+        endD[i] = model.NewIntVar(0, horizon, f"endD_{i}")
+        endC[i] = model.NewIntVar(0, horizon, f"endC_{i}")
+
+        iA[i] = model.NewIntervalVar(sA[i], ads_dur[i], sA[i] + ads_dur[i], f"iA_{i}")
+        iD[i] = model.NewIntervalVar(sD[i], des_dur[i], sD[i] + des_dur[i], f"iD_{i}")
+        iC[i] = model.NewIntervalVar(sC[i], cool_dur[i], sC[i] + cool_dur[i], f"iC_{i}")
+
+        model.Add(sD[i] >= sA[i] + ads_dur[i])
+        model.Add(sC[i] >= sD[i] + des_dur[i])
+        model.Add(endD[i] == sD[i] + des_dur[i])
+        model.Add(endC[i] == sC[i] + cool_dur[i])
+
+        if enforce_no_idle_modules:
+            model.Add(sD[i] == sA[i] + ads_dur[i])
+            model.Add(sC[i] == sD[i] + des_dur[i])
+
+    for group in fan_groups(M, fan_pairs)[1]:
+        members = [iA[m] for m in group if m in iA]
+        if len(members) > 1:
+            model.AddNoOverlap(members)
+
+    demands = [1 for _ in M]
+    if M:
+        model.AddCumulative([iD[i] for i in M], demands, des_cap)
+        model.AddCumulative([iC[i] for i in M], demands, cool_cap)
+
+    T = model.NewIntVar(0, horizon, "makespan")
+    for i in M:
+        model.Add(T >= endC[i])
+    if fixed_makespan is not None:
+        model.Add(T == fixed_makespan)
+    model.Minimize(T)
+
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = float(time_limit)
+    solver.parameters.num_search_workers = 8
+    solve0 = time.perf_counter()
+    status = _solve_cpsat(solver, model, cancel, progress)
+    if stats is not None:
+        _add_time(stats, "cpsat_build", solve0 - build0)
+        _add_time(stats, "cpsat_solve", time.perf_counter() - solve0)
+
+    plotted_intervals = []
+    per_module_done = {i: 0 for i in M}
+    total_done = 0
+    makespan = None
+    if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        makespan = solver.Value(T)
+        for i in M:
+            SA = solver.Value(sA[i])
+            SD = solver.Value(sD[i])
+            SC = solver.Value(sC[i])
+            plotted_intervals.append((i, 0, SA, SA + ads_dur[i], 'A'))
+            plotted_intervals.append((i, 0, SD, SD + des_dur[i], 'D'))
+            plotted_intervals.append((i, 0, SC, SC + cool_dur[i], 'C'))
+            if solver.Value(endC[i]) <= horizon:
+                per_module_done[i] = 1
+                total_done += 1
+
+    return plotted_intervals, per_module_done, total_done, solver.StatusName(status), makespan
+
+
+# ---------------------------------------------------------------------------
+# Engine registry
+#
+# Every engine takes (M, ads_dur, des_dur, cool_dur, fan_pairs, horizon,
+# des_cap, cool_cap, opts) and returns the shared result dict built by
+# _engine_result(). schedule_modules() picks one via select_engine().
+# ---------------------------------------------------------------------------
+
+# problem size is measured in grid cells: modules x horizon
+CPSAT_MAX_CELLS = 5_000       # CP-SAT usually proves optimality well within budget
+HYBRID_MAX_CELLS = 50_000     # CP-SAT still improves on greedy given a warm start
+MIN_CPSAT_BUDGET = 2.0        # seconds; below this CP-SAT rarely beats greedy
+DEFAULT_TIME_LIMIT = 1.0      # seconds; interactive latency budget when none is given
+OPTIMAL_TIME_LIMIT = 20.0     # seconds; used when need_optimal=True and no budget is given
+
+# engine name, chosen reason and runtime for the most recent calls
+run_log = deque(maxlen=256)
+
+
+def _engine_result(engine, M, plotted_intervals, per_module_done, total_done, horizon,
+                   status="FEASIBLE", bound=None, makespan=None):
+    return {
+        "engine": engine,
+        "status": status,
+        "intervals": plotted_intervals,
+        "per_module_done": per_module_done,
+        "total_done": total_done,
+        "horizon": horizon,
+        "makespan": makespan if makespan is not None else horizon,
+        "bound": bound,
+        "upper_bound": None,
+        "gap": None,
+        "runtime": None,
+        "png": None,
+    }
+
+
+def _finish_result(result, M, ads_dur, des_dur, cool_dur, fan_pairs, des_cap, cool_cap, multi_cycle,
+                   batched_sync, upper_bound, reason, stats=None, cancelled=False):
+    """
+    Add the fields every schedule_modules()-format result carries after its solve (reason,
+    stats, upper bound and gap, the input problem, ...) to an _engine_result() dict whose
+    runtime is set, and record the run in run_log. Returns result.
+    """
+    result["reason"] = reason
+    result["cancelled"] = cancelled
+    result["stats"] = stats
+    result["upper_bound"] = upper_bound
+    result["gap"] = (upper_bound - result["total_done"]) / upper_bound if upper_bound else 0.0
+    result["violations"] = None
+    result["problem"] = {
+        "ads_dur": dict(ads_dur),
+        "des_dur": dict(des_dur),
+        "cool_dur": dict(cool_dur),
+        "fan_pairs": list(fan_pairs),
+        "desorption_capacity": des_cap,
+        "cooling_capacity": cool_cap,
+        "multi_cycle": multi_cycle,
+        "batched_sync": batched_sync,
+    }
+    run_log.append({
+        "engine": result["engine"],
+        "reason": reason,
+        "runtime": result["runtime"],
+        "modules": len(M),
+        "horizon": result["horizon"],
+        "total_done": result["total_done"],
+        "stats": stats,
+    })
+    return result
+
+
+def _run_greedy(M, ads_dur, des_dur, cool_dur, fan_pairs, horizon, des_cap, cool_cap, opts):
+    if opts.get("columnar"):
+        # stream straight into the columnar table, never materialising the tuple list
+        per_module_done = {i: 0 for i in M}
+        plotted_intervals = IntervalTable.from_records(iter_greedy(
+            M, ads_dur, des_dur, cool_dur, fan_pairs, horizon, des_cap, cool_cap, opts.get("batched_sync", False),
+            per_module_done=per_module_done, stats=opts.get("stats"), cancel=opts.get("cancel"),
+            progress=opts.get("progress")
+        ))
+        total_done = sum(per_module_done.values())
+    else:
+        plotted_intervals, per_module_done, total_done = fallback_greedy(
+            M, ads_dur, des_dur, cool_dur, fan_pairs, horizon, des_cap, cool_cap, opts.get("batched_sync", False),
+            stats=opts.get("stats"), cancel=opts.get("cancel"), progress=opts.get("progress")
+        )
+    return _engine_result("greedy", M, plotted_intervals, per_module_done, total_done, horizon)
+
+
+def _run_cpsat(M, ads_dur, des_dur, cool_dur, fan_pairs, horizon, des_cap, cool_cap, opts):
+    plotted_intervals, per_module_done, total_done, status, bound = cpsat_cycles(
+        M, ads_dur, des_dur, cool_dur, fan_pairs, horizon, des_cap, cool_cap,
+        time_limit=opts.get("time_limit") or OPTIMAL_TIME_LIMIT, stats=opts.get("stats"),
+        upper_bound=opts.get("upper_bound"), cancel=opts.get("cancel"), progress=opts.get("progress")
+    )
+    if status not in ("OPTIMAL", "FEASIBLE"):
+        # no solution within the budget: an empty schedule is not an answer, fall back to greedy
+        greedy = _run_greedy(M, ads_dur, des_dur, cool_dur, fan_pairs, horizon, des_cap, cool_cap, opts)
+        greedy["fallback"] = f"cpsat {status}"
+        return greedy
+    return _engine_result("cpsat", M, plotted_intervals, per_module_done, total_done, horizon,
+                          status=status, bound=bound)
+
+
+def _run_hybrid(M, ads_dur, des_dur, cool_dur, fan_pairs, horizon, des_cap, cool_cap, opts):
+    """Greedy first, then CP-SAT warm-started from it with the remaining budget; keep the better."""
+    t0 = time.perf_counter()
+    greedy = _run_greedy(M, ads_dur, des_dur, cool_dur, fan_pairs, horizon, des_cap, cool_cap, opts)
+    upper_bound = opts.get("upper_bound")
+    if upper_bound is not None and greedy["total_done"] >= upper_bound:
+        # greedy already reaches the bound: nothing left for CP-SAT to find
+        greedy["engine"] = "hybrid"
+        greedy["status"] = "OPTIMAL"
+        greedy["bound"] = upper_bound
+        return greedy
+    budget = (opts.get("time_limit") or OPTIMAL_TIME_LIMIT) - (time.perf_counter() - t0)
+    cancel = opts.get("cancel")
+    if budget <= 0 or (cancel is not None and cancel.is_set()):
+        greedy["engine"] = "hybrid"
+        return greedy
+    plotted_intervals, per_module_done, total_done, status, bound = cpsat_cycles(
+        M, ads_dur, des_dur, cool_dur, fan_pairs, horizon, des_cap, cool_cap,
+        time_limit=budget, hint=greedy["intervals"], stats=opts.get("stats"), upper_bound=upper_bound,
+        cancel=cancel, progress=opts.get("progress")
+    )
+    if total_done >= greedy["total_done"]:
+        return _engine_result("hybrid", M, plotted_intervals, per_module_done, total_done, horizon,
+                              status=status, bound=bound)
+    greedy["engine"] = "hybrid"
+    greedy["bound"] = bound
+    return greedy
+
+
+def _run_sequential(M, ads_dur, des_dur, cool_dur, fan_pairs, horizon, des_cap, cool_cap, opts):
+    plotted_intervals, per_module_done, total_done = sequential_single(
+        M, ads_dur, des_dur, cool_dur, fan_pairs, horizon, des_cap, cool_cap
+    )
+    return _engine_result("sequential", M, plotted_intervals, per_module_done, total_done, horizon)
+
+
+def _run_cpsat_makespan(M, ads_dur, des_dur, cool_dur, fan_pairs, horizon, des_cap, cool_cap, opts):
+    plotted_intervals, per_module_done, total_done, status, makespan = cpsat_makespan(
+        M, ads_dur, des_dur, cool_dur, fan_pairs, horizon, des_cap, cool_cap,
+        time_limit=opts.get("time_limit") or 10.0,
+        fixed_makespan=opts.get("fixed_makespan"),
+        enforce_no_idle_modules=opts.get("enforce_no_idle_modules", False),
+        stats=opts.get("stats"), cancel=opts.get("cancel"), progress=opts.get("progress"),
+    )
+    return _engine_result("cpsat-makespan", M, plotted_intervals, per_module_done, total_done, horizon,
+                          status=status, makespan=makespan)
+
+
+# multi_cycle: engine schedules repeated cycles (True) or one cycle per module (False)
+# batched_sync: engine honours batched_sync=True
+# optimal: engine can prove optimality
+ENGINES = {
+    "greedy": {"run": _run_greedy, "multi_cycle": True, "batched_sync": True, "optimal": False},
+    "cpsat": {"run": _run_cpsat, "multi_cycle": True, "batched_sync": False, "optimal": True},
+    "hybrid": {"run": _run_hybrid, "multi_cycle": True, "batched_sync": False, "optimal": True},
+    "sequential": {"run": _run_sequential, "multi_cycle": False, "batched_sync": True, "optimal": False},
+    "cpsat-makespan": {"run": _run_cpsat_makespan, "multi_cycle": False, "batched_sync": True, "optimal": True},
+}
+
+
+def have_cpsat():
+    """True if ortools is installed; checked without importing it."""
+    return importlib.util.find_spec("ortools") is not None
+
+
+def select_engine(n_modules, horizon, multi_cycle=True, batched_sync=False,
+                  time_limit=None, need_optimal=False):
+    """
+    Pick an engine name from problem size (modules x horizon), latency budget
+    (seconds) and whether an optimality proof is needed.
+    Returns (engine_name, reason)
+    """
+    cells = n_modules * horizon
+    budget = time_limit if time_limit is not None else DEFAULT_TIME_LIMIT
+
+    if not have_cpsat():
+        if multi_cycle:
+            return "greedy", "ortools not installed"
+        return "sequential", "ortools not installed"
+    if not multi_cycle:
+        if need_optimal or (budget >= MIN_CPSAT_BUDGET and cells <= CPSAT_MAX_CELLS):
+            return "cpsat-makespan", f"single cycle, {cells} cells, budget {budget}s"
+        return "sequential", f"single cycle, budget {budget}s"
+
+    if batched_sync:
+        return "greedy", "batched_sync is only supported by the greedy engine"
+    if need_optimal:
+        return "cpsat", "optimality proof requested"
+    if budget < MIN_CPSAT_BUDGET:
+        return "greedy", f"budget {budget}s below {MIN_CPSAT_BUDGET}s"
+    if cells <= CPSAT_MAX_CELLS:
+        return "cpsat", f"{cells} cells <= {CPSAT_MAX_CELLS}"
+    if cells <= HYBRID_MAX_CELLS:
+        return "hybrid", f"{cells} cells <= {HYBRID_MAX_CELLS}"
+    return "greedy", f"{cells} cells > {HYBRID_MAX_CELLS}"
+
+
+def render_gantt(M, plotted_intervals, makespan, title, out_fn="gantt.png"):
+    """Save a Gantt chart of plotted_intervals to out_fn; returns out_fn or None if plotting failed."""
+    return render_gantt_panels(M, [(plotted_intervals, title)], makespan, out_fn)
+
+
+def render_gantt_panels(M, panels, makespan, out_fn="gantt.png"):
+    """
+    Save one figure with a Gantt chart per (plotted_intervals, title) panel, stacked on a
+    shared time axis, to out_fn; returns out_fn or None if plotting failed.
+    """
     try:
         import matplotlib.pyplot as plt
         import matplotlib.patches as mpatches
-        makespan = plot_horizon if plot_horizon is not None else horizon
         width = max(10, makespan / 6)
-        height = max(3, 1 + len(M) * 0.8)
-        fig, ax = plt.subplots(figsize=(width, height), dpi=180)
+        # rows shrink past ~50 modules so large plants stay within matplotlib's pixel limit
+        height = max(3, min(40, 1 + len(M) * 0.8))
+        label_size = 12 if len(M) <= 40 else max(3, 480 // len(M))
+        fig, axes = plt.subplots(len(panels), 1, figsize=(width, min(80, height * len(panels))), dpi=180,
+                                 sharex=True, squeeze=False)
         colors = {"A": "#1f77b4", "D": "#ff7f0e", "C": "#2ca02c"}
-        for yi, i in enumerate(M):
-            intvs = [(rec[2], rec[3], rec[4]) for rec in plotted_intervals if rec[0] == i]
-            for s, e, typ in intvs:
-                if e <= 0 or s >= makespan:
-                    continue
-                s_clipped = max(0, s)
-                dur = max(0, min(e, makespan) - s_clipped)
-                ax.broken_barh([(s_clipped, dur)], (yi - 0.35, 0.7), facecolors=colors[typ], edgecolor="k", linewidth=0.3)
-        ax.set_yticks(list(range(len(M))))
-        ax.set_yticklabels([f"Module {i}" for i in M], fontsize=12)
-        ax.set_xlabel("Time", fontsize=12)
-        ax.set_xlim(0, makespan)
-        ax.set_ylim(-1, len(M))
-        ax.grid(True, axis="x", linestyle="--", linewidth=0.4, alpha=0.6)
+        phase_colors = [colors[p] for p in PHASES]
+        for ax, (plotted_intervals, title) in zip(axes[:, 0], panels):
+            table = plotted_intervals if isinstance(plotted_intervals, IntervalTable) else IntervalTable.from_records(plotted_intervals)
+            for yi, i in enumerate(M):
+                for s, e, p in zip(*table.module_slice(i)):
+                    if e <= 0 or s >= makespan:
+                        continue
+                    s_clipped = max(0, s)
+                    dur = max(0, min(e, makespan) - s_clipped)
+                    ax.broken_barh([(s_clipped, dur)], (yi - 0.35, 0.7), facecolors=phase_colors[p], edgecolor="k", linewidth=0.3)
+            ax.set_yticks(list(range(len(M))))
+            ax.set_yticklabels([f"Module {i}" for i in M], fontsize=label_size)
+            ax.set_xlim(0, makespan)
+            ax.set_ylim(-1, len(M))
+            ax.grid(True, axis="x", linestyle="--", linewidth=0.4, alpha=0.6)
+            ax.set_title(title, fontsize=14)
+        axes[-1, 0].set_xlabel("Time", fontsize=12)
         patches = [mpatches.Patch(color=colors[k], label={"A": "Adsorption", "D": "Desorption", "C": "Cooling"}[k]) for k in ("A","D","C")]
-        ax.legend(handles=patches, loc='upper right', fontsize=11)
-        ax.set_title("Gantt chart (single back-to-back cycle)", fontsize=14)
+        axes[0, 0].legend(handles=patches, loc='upper right', fontsize=11)
         plt.tight_layout()
         plt.savefig(out_fn, dpi=180)
         plt.close(fig)
     except Exception:
         out_fn = None
+    return out_fn
+
 
-    return per_module_done, total_done, out_fn
+def _gantt_title(result, batched_sync):
+    if result["engine"] in ("sequential", "cpsat-makespan"):
+        return "Gantt chart (single back-to-back cycle)"
+    if result["engine"] in ("cpsat", "hybrid"):
+        return "Gantt chart (tiled cycles, CP-SAT)"
+    return "Gantt chart (tiled cycles, batched sync)" if batched_sync else "Gantt chart (tiled cycles)"
+
+
+def schedule_modules(ads_dur, des_dur, cool_dur, fan_pairs,
+                     desorption_capacity=2, cooling_capacity=2,
+                     fixed_makespan=None, plot_horizon=None,
+                     multi_cycle=False, batched_sync=False,
+                     engine="auto", time_limit=None, need_optimal=False,
+                     enforce_no_idle_modules=False, render=True, return_result=False, columnar=False,
+                     out_fn="gantt.png", instrument=False, validate=False, cancel=None, progress=None):
+    """
+    Schedule modules with the engine picked by select_engine() (or the one named by engine=).
+    multi_cycle=True packs repeated cycles (greedy, cpsat or hybrid engine); if batched_sync=True
+    the greedy packer will start D and C at the same common time for each batch.
+    multi_cycle=False schedules one back-to-back cycle per module (sequential or cpsat-makespan).
+    time_limit is the latency budget in seconds; need_optimal asks for a CP-SAT optimality proof.
+    columnar=True stores result["intervals"] as an IntervalTable instead of a list of tuples.
+    render=False skips the Gantt PNG; out_fn is where it is saved otherwise.
+    instrument=True collects hot-path counters and per-stage timings (see new_stats())
+    into result["stats"]; it is None otherwise.
+    Every result carries result["upper_bound"] (cycle_upper_bound()) and result["gap"],
+    the share of that bound the schedule leaves unused.
+    validate=True checks the schedule with validate.py and stores the violation list in
+    result["violations"] (empty when valid); it is None otherwise.
+    cancel: optional threading.Event that stops the solve early (the greedy packer at its next
+    tick, CP-SAT via StopSearch); the schedule found so far is returned with
+    result["cancelled"] set and no chart. progress: optional callable(fraction, objective),
+    objective being the cycles completed so far (the makespan for cpsat-makespan).
+    Returns (per_module_done, total_done, png_filename), or the full result dict
+    (intervals, engine, status, runtime, ...) when return_result=True.
+    """
+    M = sorted(ads_dur.keys())
+
+    if multi_cycle:
+        horizon = fixed_makespan if fixed_makespan is not None else (plot_horizon if plot_horizon is not None else 24)
+    else:
+        horizon = fixed_makespan if fixed_makespan is not None else (sum(ads_dur.values()) + sum(des_dur.values()) + sum(cool_dur.values()))
+
+    if engine == "auto":
+        engine, reason = select_engine(len(M), horizon, multi_cycle, batched_sync, time_limit, need_optimal)
+    else:
+        reason = "requested"
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine {engine!r}; expected one of {sorted(ENGINES)}")
+    spec = ENGINES[engine]
+    if spec["multi_cycle"] != bool(multi_cycle):
+        raise ValueError(f"Engine {engine!r} does not support multi_cycle={multi_cycle}")
+    if batched_sync and not spec["batched_sync"]:
+        raise ValueError(f"Engine {engine!r} does not support batched_sync")
+
+    opts = {
+        "batched_sync": batched_sync,
+        "time_limit": time_limit,
+        "fixed_makespan": fixed_makespan,
+        "enforce_no_idle_modules": enforce_no_idle_modules,
+        "columnar": columnar,
+        "stats": new_stats() if instrument else None,
+        "cancel": cancel,
+        "progress": progress,
+    }
+    bound0 = time.perf_counter()
+    upper_bound = cycle_upper_bound(M, ads_dur, des_dur, cool_dur, fan_pairs, horizon,
+                                    desorption_capacity, cooling_capacity, single_cycle=not multi_cycle)
+    opts["upper_bound"] = upper_bound
+    if opts["stats"] is not None:
+        _add_time(opts["stats"], "bound", time.perf_counter() - bound0)
+    t0 = time.perf_counter()
+    result = spec["run"](M, ads_dur, des_dur, cool_dur, fan_pairs, horizon,
+                         desorption_capacity, cooling_capacity, opts)
+    result["runtime"] = time.perf_counter() - t0
+    if "fallback" in result:
+        reason = f"{reason}; {result.pop('fallback')}"
+    stats = opts["stats"]
+    _finish_result(result, M, ads_dur, des_dur, cool_dur, fan_pairs, desorption_capacity, cooling_capacity,
+                   multi_cycle, batched_sync, upper_bound, reason, stats, cancel is not None and cancel.is_set())
+    if columnar and not isinstance(result["intervals"], IntervalTable):
+        result["intervals"] = IntervalTable.from_records(result["intervals"])
+    if validate:
+        from validate import validate_intervals
+        check0 = time.perf_counter()
+        result["violations"] = validate_intervals(result["intervals"], ads_dur, des_dur, cool_dur, fan_pairs,
+                                                  desorption_capacity, cooling_capacity)
+        if stats is not None:
+            _add_time(stats, "validate", time.perf_counter() - check0)
+
+    if render and not result["cancelled"]:
+        makespan = plot_horizon if plot_horizon is not None else result["makespan"]
+        render0 = time.perf_counter()
+        result["png"] = render_gantt(M, result["intervals"], makespan, _gantt_title(result, batched_sync), out_fn)
+        if stats is not None:
+            _add_time(stats, "render", time.perf_counter() - render0)
+    if stats is not None:
+        _add_time(stats, "solve", result["runtime"])
+
+    if return_result:
+        return result
+    return result["per_module_done"], result["total_done"], result["png"]
+
+
+# desorption strategies: serialized runs one desorption and one cooling at a time,
+# interleaved overlaps them up to the configured capacities
+STRATEGIES = ("serialized", "interleaved")
+
+
+def _variants_title(result):
+    names = ", ".join(f"{strategy} + batched sync" if batched_sync else strategy
+                      for strategy, batched_sync in result["variants"])
+    return f"{names}: {result['total_done']} cycles"
+
+
+def schedule_strategies(ads_dur, des_dur, cool_dur, fan_pairs, horizon,
+                        desorption_capacity=2, cooling_capacity=2,
+                        strategies=STRATEGIES, batched=(False, True),
+                        render=True, out_fn="gantt_strategies.png", instrument=False, cancel=None, progress=None):
+    """
+    Greedy multi-cycle schedules of one problem for every strategy x batched_sync variant
+    in one call. Fan groups are computed once and the upper bound once per capacity pair;
+    variants that cannot differ are solved once and share a result: serialized equals
+    interleaved at capacities 1/1, and batched_sync changes nothing when every module
+    desorbs for the same time.
+    Each result is a schedule_modules(return_result=True) dict plus result["variants"],
+    the (strategy, batched_sync) keys it covers. render=True draws every distinct schedule
+    into one figure saved to out_fn.
+    cancel / progress: as for schedule_modules(); progress counts the variants covered so far.
+    A cancelled call returns the variants finished before it with "cancelled" set.
+    Returns {"variants": {(strategy, batched_sync): result}, "schedules": distinct schedules
+    solved, "png": out_fn or None, "runtime": seconds, "stats": new_stats() dict or None,
+    "cancelled": bool}.
+    """
+    for strategy in strategies:
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown strategy {strategy!r}; expected one of {list(STRATEGIES)}")
+    t_start = time.perf_counter()
+    M = sorted(ads_dur.keys())
+    stats = new_stats() if instrument else None
+    groups = fan_groups(M, fan_pairs)
+    batched_matters = len(set(des_dur.values())) > 1
+
+    bounds = {}
+    solved = {}
+    variants = {}
+    n_variants = len(strategies) * len(batched)
+    for strategy in strategies:
+        caps = (1, 1) if strategy == "serialized" else (desorption_capacity, cooling_capacity)
+        for batched_sync in batched:
+            if cancel is not None and cancel.is_set():
+                break
+            key = caps + (bool(batched_sync) and batched_matters,)
+            if key not in solved:
+                if caps not in bounds:
+                    bound0 = time.perf_counter()
+                    bounds[caps] = cycle_upper_bound(M, ads_dur, des_dur, cool_dur, fan_pairs, horizon, *caps,
+                                                     groups=groups)
+                    if stats is not None:
+                        _add_time(stats, "bound", time.perf_counter() - bound0)
+                t0 = time.perf_counter()
+                plotted_intervals, per_module_done, total_done = fallback_greedy(
+                    M, ads_dur, des_dur, cool_dur, fan_pairs, horizon, *key, stats=stats, groups=groups,
+                    cancel=cancel
+                )
+                if cancel is not None and cancel.is_set():
+                    break
+                result = _engine_result("greedy", M, plotted_intervals, per_module_done, total_done, horizon)
+                result["runtime"] = time.perf_counter() - t0
+                _finish_result(result, M, ads_dur, des_dur, cool_dur, fan_pairs, *caps, True, key[2], bounds[caps],
+                               "strategy comparison", stats)
+                result["variants"] = []
+                solved[key] = result
+                if stats is not None:
+                    _add_time(stats, "solve", result["runtime"])
+            solved[key]["variants"].append((strategy, bool(batched_sync)))
+            variants[(strategy, bool(batched_sync))] = key
+            if progress is not None:
+                progress(len(variants) / n_variants, solved[key]["total_done"])
+
+    cancelled = cancel is not None and cancel.is_set()
+    png = None
+    if render and solved and not cancelled:
+        render0 = time.perf_counter()
+        png = render_gantt_panels(M, [(r["intervals"], _variants_title(r)) for r in solved.values()], horizon, out_fn)
+        for result in solved.values():
+            result["png"] = png
+        if stats is not None:
+            _add_time(stats, "render", time.perf_counter() - render0)
+    # a shared schedule is returned for each variant it covers, recording that variant's batched_sync
+    for variant, key in variants.items():
+        shared = solved[key]
+        if shared["problem"]["batched_sync"] != variant[1]:
+            shared = dict(shared, problem=dict(shared["problem"], batched_sync=variant[1]))
+        variants[variant] = shared
+    return {
+        "variants": variants,
+        "schedules": len(solved),
+        "png": png,
+        "runtime": time.perf_counter() - t_start,
+        "stats": stats,
+        "cancelled": cancelled,
+    }
 
 
 if __name__ == "__main__":
+    import sys
+    if len(sys.argv) > 1:
+        # non-interactive batch mode: python schedule.py scenarios.jsonl -o results.jsonl
+        from batch import main
+        sys.exit(main())
+
     def prompt_list_ints(msg, expected=None):
         s = input(msg).strip()
         parts = [p.strip() for p in s.split(",") if p.strip()]
@@ -0,0 +1,230 @@
+"""
+Local scheduling service: keeps a pool of warm solver processes, coalesces
+identical in-flight requests and serves repeated requests from an LRU cache.
+
+    python service.py --port 8765 --workers 4
+    python service.py --socket /tmp/scheduler.sock
+
+Endpoints (JSON over HTTP/1.1, one request per connection):
+    POST /schedule   body: a scenario as accepted by batch.py (plus "intervals": true
+                     to include intervals, "render": true for a Gantt PNG);
+                     reply: the batch.py result line
+    GET  /health     {"ok": true}
+    GET  /stats      request, cache and coalescing counters
+
+Clients use request_schedule(scenario, url) with url "http://host:port" or
+"unix:///path/to.sock"; app.py and batch.py --service go through it.
+"""
+import argparse
+import asyncio
+import hashlib
+import http.client
+import json
+import os
+import socket
+import sys
+import tempfile
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+DEFAULT_PORT = 8765
+DEFAULT_CACHE_SIZE = 1024
+
+
+def _warm():
+    """Worker initializer: pay the heavy imports once per process, not per request."""
+    import schedule  # noqa: F401
+    try:
+        from ortools.sat.python import cp_model  # noqa: F401
+    except ImportError:
+        pass
+    try:
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.pyplot  # noqa: F401
+    except ImportError:
+        pass
+
+
+def _solve(raw, png_dir, with_intervals):
+    from batch import run_scenario
+    line, _ = run_scenario(0, raw, png_dir, with_intervals)
+    line.pop("index", None)
+    return line
+
+
+def scenario_key(raw):
+    """Canonical key of a scenario: identical problems map to the same key whatever their name."""
+    from batch import normalize_scenario
+    scn = normalize_scenario(raw, 0)
+    scn.pop("name")
+    for k in ("ads_dur", "des_dur", "cool_dur"):
+        scn[k] = sorted(scn[k].items())
+    scn["intervals"] = bool(raw.get("intervals"))
+    scn["render"] = bool(raw.get("render"))
+    return json.dumps(scn, sort_keys=True)
+
+
+class SchedulingService:
+    def __init__(self, workers=None, cache_size=DEFAULT_CACHE_SIZE, png_dir=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_warm)
+        self.cache = OrderedDict()
+        self.cache_size = cache_size
+        self.png_dir = png_dir or os.path.join(tempfile.gettempdir(), "scheduler-png")
+        self.in_flight = {}
+        self.stats = {"requests": 0, "cache_hits": 0, "coalesced": 0, "solves": 0, "errors": 0}
+
+    async def solve(self, raw):
+        self.stats["requests"] += 1
+        key = scenario_key(raw)
+        if key in self.cache:
+            self.stats["cache_hits"] += 1
+            self.cache.move_to_end(key)
+            return self.cache[key]
+        fut = self.in_flight.get(key)
+        if fut is not None:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(fut)
+
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self.in_flight[key] = fut
+        try:
+            digest = hashlib.sha1(key.encode()).hexdigest()[:16]
+            job = dict(raw, name=digest)
+            png_dir = self.png_dir if raw.get("render") else None
+            self.stats["solves"] += 1
+            line = await loop.run_in_executor(self.pool, _solve, job, png_dir, bool(raw.get("intervals")))
+            line.pop("name", None)
+            if line["ok"]:
+                self.cache[key] = line
+                if len(self.cache) > self.cache_size:
+                    self.cache.popitem(last=False)
+            else:
+                self.stats["errors"] += 1
+            fut.set_result(line)
+            return line
+        except Exception as e:
+            fut.set_exception(e)
+            fut.exception()  # retrieved here; coalesced waiters re-raise it themselves
+            raise
+        finally:
+            del self.in_flight[key]
+
+    async def handle(self, reader, writer):
+        status, payload = 200, None
+        try:
+            request_line = (await reader.readline()).decode("latin1").split()
+            headers = {}
+            while True:
+                line = (await reader.readline()).decode("latin1").strip()
+                if not line:
+                    break
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+            body = await reader.readexactly(int(headers.get("content-length", 0)))
+            method, path = request_line[0], request_line[1]
+            if method == "GET" and path == "/health":
+                payload = {"ok": True}
+            elif method == "GET" and path == "/stats":
+                payload = dict(self.stats, cached=len(self.cache), in_flight=len(self.in_flight))
+            elif method == "POST" and path == "/schedule":
+                raw = json.loads(body)
+                name = raw.get("name")
+                payload = dict(await self.solve(raw), name=name)
+            else:
+                status, payload = 404, {"ok": False, "error": f"no route for {method} {path}"}
+        except (ValueError, KeyError, TypeError) as e:
+            status, payload = 400, {"ok": False, "error": f"{type(e).__name__}: {e}"}
+        except Exception as e:
+            status, payload = 500, {"ok": False, "error": f"{type(e).__name__}: {e}"}
+        data = json.dumps(payload).encode()
+        reason = {200: "OK", 400: "Bad Request", 404: "Not Found", 500: "Internal Server Error"}[status]
+        writer.write(f"HTTP/1.1 {status} {reason}\r\nContent-Type: application/json\r\n"
+                     f"Content-Length: {len(data)}\r\nConnection: close\r\n\r\n".encode() + data)
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=DEFAULT_PORT, unix_socket=None):
+        # start every worker now so the first requests do not pay for spawning and imports
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self.pool, _warm) for _ in range(self.workers)))
+        if unix_socket:
+            server = await asyncio.start_unix_server(self.handle, path=unix_socket)
+            where = unix_socket
+        else:
+            server = await asyncio.start_server(self.handle, host, port)
+            where = f"http://{host}:{port}"
+        print(f"Scheduling service listening on {where}", file=sys.stderr)
+        async with server:
+            await server.serve_forever()
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path, timeout):
+        super().__init__("localhost", timeout=timeout)
+        self.unix_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.unix_path)
+
+
+def _connect(url, timeout):
+    if url.startswith("unix://"):
+        return _UnixHTTPConnection(url[len("unix://"):], timeout)
+    host_port = url.split("://", 1)[-1].rstrip("/")
+    return http.client.HTTPConnection(host_port, timeout=timeout)
+
+
+def request_schedule(scenario, url=None, timeout=120.0):
+    """
+    Solve a scenario through the service at url (default: $SCHEDULER_URL).
+    Returns the batch.py result line with per_module_done keyed by int module.
+    Raises OSError if the service cannot be reached, so callers can fall back to solving locally.
+    """
+    url = url or os.environ.get("SCHEDULER_URL")
+    if not url:
+        raise OSError("no scheduling service configured (set SCHEDULER_URL)")
+    body = json.dumps(scenario).encode()
+    conn = _connect(url, timeout)
+    try:
+        conn.request("POST", "/schedule", body, {"Content-Type": "application/json"})
+        resp = conn.getresponse()
+        line = json.loads(resp.read())
+    finally:
+        conn.close()
+    if "per_module_done" in line:
+        line["per_module_done"] = {int(k): v for k, v in line["per_module_done"].items()}
+    return line
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Local scheduling service with warm solver workers.")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=DEFAULT_PORT)
+    ap.add_argument("--socket", default=None, help="listen on this Unix socket instead of TCP")
+    ap.add_argument("--workers", type=int, default=None, help="solver processes (default: CPU count)")
+    ap.add_argument("--cache-size", type=int, default=DEFAULT_CACHE_SIZE)
+    ap.add_argument("--png-dir", default=None, help="where rendered Gantt PNGs are written")
+    args = ap.parse_args(argv)
+
+    service = SchedulingService(args.workers, args.cache_size, args.png_dir)
+    os.makedirs(service.png_dir, exist_ok=True)
+    started = time.perf_counter()
+    try:
+        asyncio.run(service.serve(args.host, args.port, args.socket))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.pool.shutdown(cancel_futures=True)
+        print(f"Served {service.stats['requests']} requests in {time.perf_counter() - started:.0f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,342 @@
+"""
+Precomputed schedule lookup table for common plant configurations.
+
+    python table.py schedule_table.bin -j 8                  # build the default grid
+    python table.py schedule_table.bin --grid grid.json      # or a declared one
+    python batch.py scenarios.jsonl --table schedule_table.bin
+
+The build step solves every point of a parameter grid with the greedy
+multi-cycle engine (the one schedule_modules() picks for these sizes unless a
+CP-SAT budget or proof is asked for) and writes per-module cycles, total cycles
+and the upper bound into one binary file: a JSON header declaring the grid, then
+one fixed-width column per field with a record per grid point. A record's
+position follows from the grid axes, so a lookup is a handful of dict lookups
+and one slice of the memory-mapped file, whatever the table size.
+
+The grid covers identical modules (one adsorption, desorption and cooling time
+for the whole plant) under the standard fan pairings. batched_sync is not an
+axis: when every module desorbs for the same time it does not change the greedy
+schedule. Intervals are not stored, so requests for a chart, intervals or a
+validation, like everything outside the grid, are solved live.
+"""
+import argparse
+import json
+import mmap
+import os
+import sys
+import time
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+FORMAT = "module-pairs-table"
+VERSION = 1
+MAGIC = b"MPTABLE\x01"
+
+# outermost to innermost; a record's index is the mixed-radix number of its axis positions
+AXES = ("horizon", "modules", "pairing", "desorption_capacity", "cooling_capacity", "ads_dur", "des_dur", "cool_dur")
+DEFAULT_GRID = {
+    "horizon": [600, 1440],
+    "modules": list(range(2, 9)),
+    "pairing": ["independent", "sequential"],
+    "desorption_capacity": [1, 2, 3, 4],
+    "cooling_capacity": [1, 2, 3, 4],
+    "ads_dur": list(range(15, 61, 5)),
+    "des_dur": list(range(15, 61, 5)),
+    "cool_dur": list(range(15, 61, 5)),
+}
+
+
+def standard_pairings(n_modules):
+    """Fan pairings the table covers: every module on its own fan, or neighbours 1-2, 3-4, ... sharing one."""
+    return {
+        "independent": [],
+        "sequential": [(i, i + 1) for i in range(1, n_modules, 2)],
+    }
+
+
+def _pairing_name(fan_pairs, n_modules):
+    key = sorted(tuple(sorted(p)) for p in fan_pairs)
+    for name, pairs in standard_pairings(n_modules).items():
+        if key == sorted(pairs):
+            return name
+    return None
+
+
+def check_grid(grid):
+    """Validate a grid declaration; returns it with every axis as a list."""
+    missing = [axis for axis in AXES if axis not in grid]
+    if missing:
+        raise ValueError(f"grid is missing axes {missing}")
+    out = {}
+    for axis in AXES:
+        values = list(grid[axis])
+        if not values or len(set(values)) != len(values):
+            raise ValueError(f"grid axis {axis!r} must list distinct values")
+        if axis == "pairing":
+            unknown = set(values) - set(standard_pairings(2))
+            if unknown:
+                raise ValueError(f"unknown pairings {sorted(unknown)}; expected {sorted(standard_pairings(2))}")
+        elif not all(isinstance(v, int) and v > 0 for v in values):
+            raise ValueError(f"grid axis {axis!r} must list positive integers")
+        out[axis] = values
+    if min(out["modules"]) < 2:
+        raise ValueError("grid modules must be at least 2")
+    return out
+
+
+def _solve_block(grid, horizon, n_modules, pairing, des_cap, cool_cap):
+    """Records of every duration combination for one (horizon, modules, pairing, capacities) point."""
+    from schedule import cycle_upper_bound, fan_groups, iter_greedy
+
+    M = list(range(1, n_modules + 1))
+    fan_pairs = standard_pairings(n_modules)[pairing]
+    groups = fan_groups(M, fan_pairs)
+    counts, totals, bounds = [], [], []
+    for a in grid["ads_dur"]:
+        ads = dict.fromkeys(M, a)
+        for d in grid["des_dur"]:
+            des = dict.fromkeys(M, d)
+            for c in grid["cool_dur"]:
+                cool = dict.fromkeys(M, c)
+                per_module_done = {}
+                deque(iter_greedy(M, ads, des, cool, fan_pairs, horizon, des_cap, cool_cap,
+                                  per_module_done=per_module_done, groups=groups), maxlen=0)
+                counts.append([per_module_done[i] for i in M])
+                totals.append(sum(per_module_done.values()))
+                bounds.append(cycle_upper_bound(M, ads, des, cool, fan_pairs, horizon, des_cap, cool_cap,
+                                                groups=groups))
+    return counts, totals, bounds
+
+
+def _typecode(largest):
+    return "B" if largest <= 0xFF else "H" if largest <= 0xFFFF else "I"
+
+
+def build_table(path, grid=None, workers=None, log=None):
+    """
+    Solve every point of grid (DEFAULT_GRID if None) and write the table to path.
+    workers > 1 solves blocks of the grid in a process pool. log: optional file for
+    progress lines. Returns the number of records written.
+    """
+    grid = check_grid(grid or DEFAULT_GRID)
+    width = max(grid["modules"])
+    block = len(grid["ads_dur"]) * len(grid["des_dur"]) * len(grid["cool_dur"])
+    tasks = [(grid, h, n, p, dc, cc) for h in grid["horizon"] for n in grid["modules"] for p in grid["pairing"]
+             for dc in grid["desorption_capacity"] for cc in grid["cooling_capacity"]]
+
+    # a module completes at most horizon // ads_dur cycles
+    cap = max(grid["horizon"]) // min(grid["ads_dur"])
+    columns = {
+        "counts": array(_typecode(cap)),
+        "total": array(_typecode(cap * width)),
+        "upper_bound": array(_typecode(cap * width)),
+    }
+    t0 = time.perf_counter()
+    if workers and workers > 1:
+        pool = ProcessPoolExecutor(max_workers=workers)
+        blocks = pool.map(_solve_block, *zip(*tasks), chunksize=max(1, len(tasks) // (workers * 8)))
+    else:
+        pool = None
+        blocks = (_solve_block(*task) for task in tasks)
+    try:
+        for n, (counts, totals, bounds) in enumerate(blocks, 1):
+            for row in counts:
+                columns["counts"].extend(row + [0] * (width - len(row)))
+            columns["total"].extend(totals)
+            columns["upper_bound"].extend(bounds)
+            if log is not None and (n % 50 == 0 or n == len(tasks)):
+                print(f"{n}/{len(tasks)} blocks, {time.perf_counter() - t0:.1f}s", file=log)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    header = {
+        "format": FORMAT,
+        "version": VERSION,
+        "byteorder": sys.byteorder,
+        "engine": "greedy",
+        "grid": grid,
+        "records": len(tasks) * block,
+        "width": width,
+        "columns": {},
+        "built": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    # column offsets count from the start of the data, which begins 8-byte aligned after the header
+    pos = 0
+    for name, col in columns.items():
+        header["columns"][name] = {"offset": pos, "typecode": col.typecode, "length": len(col)}
+        pos = _align(pos + col.itemsize * len(col))
+    encoded = json.dumps(header).encode()
+    data_start = _align(len(MAGIC) + 4 + len(encoded))
+    with open(path, "wb") as fh:
+        fh.write(MAGIC)
+        fh.write(len(encoded).to_bytes(4, "little"))
+        fh.write(encoded)
+        for name, col in columns.items():
+            fh.write(b"\0" * (data_start + header["columns"][name]["offset"] - fh.tell()))
+            col.tofile(fh)
+    return header["records"]
+
+
+def _align(n, to=8):
+    return -(-n // to) * to
+
+
+class ScheduleTable:
+    """
+    Read-only, memory-mapped view of a table written by build_table(). Opening one
+    reads only the header; each lookup touches one record.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as fh:
+            self._mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[:len(MAGIC)] != MAGIC:
+            self._mm.close()
+            raise ValueError(f"{path} is not a schedule table")
+        hlen = int.from_bytes(self._mm[len(MAGIC):len(MAGIC) + 4], "little")
+        header = json.loads(self._mm[len(MAGIC) + 4:len(MAGIC) + 4 + hlen])
+        if header.get("format") != FORMAT or header.get("version") != VERSION:
+            self._mm.close()
+            raise ValueError(f"{path} is not a version {VERSION} schedule table")
+        if header["byteorder"] != sys.byteorder:
+            self._mm.close()
+            raise ValueError(f"{path} was built on a {header['byteorder']}-endian machine")
+        self.path = path
+        self.header = header
+        self.grid = header["grid"]
+        self.width = header["width"]
+        self.columns = {}
+        data_start = _align(len(MAGIC) + 4 + hlen)
+        for name, spec in header["columns"].items():
+            lo = data_start + spec["offset"]
+            size = array(spec["typecode"]).itemsize * spec["length"]
+            self.columns[name] = memoryview(self._mm)[lo:lo + size].cast(spec["typecode"])
+        # position of every axis value, and the record stride of every axis
+        self._pos = {axis: {v: n for n, v in enumerate(self.grid[axis])} for axis in AXES}
+        self._strides = {}
+        stride = 1
+        for axis in reversed(AXES):
+            self._strides[axis] = stride
+            stride *= len(self.grid[axis])
+
+    def __len__(self):
+        return self.header["records"]
+
+    def index(self, **point):
+        """Record index of a grid point given as axis=value keywords, or None if it is off the grid."""
+        idx = 0
+        for axis in AXES:
+            n = self._pos[axis].get(point[axis])
+            if n is None:
+                return None
+            idx += n * self._strides[axis]
+        return idx
+
+    def lookup(self, ads_dur, des_dur, cool_dur, fan_pairs, horizon, des_cap, cool_cap):
+        """
+        (per_module_done, total_done, upper_bound) of the greedy schedule from the table,
+        or None if the problem is not one of its grid points.
+        """
+        M = sorted(ads_dur.keys())
+        n_modules = len(M)
+        if M != list(range(1, n_modules + 1)) or sorted(des_dur) != M or sorted(cool_dur) != M:
+            return None
+        durations = []
+        for dur in (ads_dur, des_dur, cool_dur):
+            values = set(dur.values())
+            if len(values) != 1:
+                return None  # only plants of identical modules are tabulated
+            durations.append(values.pop())
+        pairing = _pairing_name(fan_pairs, n_modules)
+        if pairing is None:
+            return None
+        idx = self.index(horizon=horizon, modules=n_modules, pairing=pairing, desorption_capacity=des_cap,
+                         cooling_capacity=cool_cap, ads_dur=durations[0], des_dur=durations[1],
+                         cool_dur=durations[2])
+        if idx is None:
+            return None
+        counts = self.columns["counts"][idx * self.width:idx * self.width + n_modules]
+        return dict(zip(M, counts)), self.columns["total"][idx], self.columns["upper_bound"][idx]
+
+    def close(self):
+        for view in self.columns.values():
+            view.release()
+        self.columns = {}
+        self._mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+_loaded = {}
+
+
+def load_table(path):
+    """Open the table at path; each path is mapped once per process and shared afterwards."""
+    key = os.path.abspath(path)
+    table = _loaded.get(key)
+    if table is None:
+        table = _loaded[key] = ScheduleTable(path)
+    return table
+
+
+def table_result(table, ads_dur, des_dur, cool_dur, fan_pairs,
+                 desorption_capacity=2, cooling_capacity=2, fixed_makespan=None, plot_horizon=None,
+                 multi_cycle=False, batched_sync=False, engine="auto", time_limit=None, need_optimal=False,
+                 render=True, validate=False, columnar=False, instrument=False, **ignored):
+    """
+    The schedule_modules(..., return_result=True) result for these arguments answered from
+    table, or None when it has to be solved live: the problem is off the grid, the engine
+    would not be greedy, or the caller needs what the table does not store (render,
+    validate, columnar intervals, instrument stats). result["intervals"] is None and result["table"] is True.
+    """
+    from schedule import _engine_result, _finish_result, select_engine
+
+    if not multi_cycle or render or validate or columnar or instrument:
+        return None
+    t0 = time.perf_counter()
+    horizon = fixed_makespan if fixed_makespan is not None else (plot_horizon if plot_horizon is not None else 24)
+    if engine == "auto":
+        engine = select_engine(len(ads_dur), horizon, True, batched_sync, time_limit, need_optimal)[0]
+    if engine != "greedy":
+        return None
+    found = table.lookup(ads_dur, des_dur, cool_dur, fan_pairs, horizon, desorption_capacity, cooling_capacity)
+    if found is None:
+        return None
+    per_module_done, total_done, upper_bound = found
+    M = sorted(ads_dur.keys())
+    result = _engine_result("greedy", M, None, per_module_done, total_done, horizon)
+    result["runtime"] = time.perf_counter() - t0
+    result["table"] = True
+    return _finish_result(result, M, ads_dur, des_dur, cool_dur, fan_pairs, desorption_capacity, cooling_capacity,
+                          True, batched_sync, upper_bound, "lookup table")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Precompute greedy schedules over a parameter grid into a lookup table.")
+    ap.add_argument("output", help="table file to write")
+    ap.add_argument("--grid", default=None, help=f"grid declaration as JSON with the axes {', '.join(AXES)}")
+    ap.add_argument("-j", "--workers", type=int, default=os.cpu_count(), help="worker processes")
+    args = ap.parse_args(argv)
+
+    grid = None
+    if args.grid:
+        try:
+            with open(args.grid) as fh:
+                grid = check_grid(json.load(fh))
+        except (OSError, ValueError) as e:
+            raise SystemExit(f"Could not read grid: {e}")
+    t0 = time.perf_counter()
+    records = build_table(args.output, grid, args.workers, log=sys.stderr)
+    print(f"{records} records, {os.path.getsize(args.output) / 1e6:.1f} MB, "
+          f"{time.perf_counter() - t0:.1f}s -> {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
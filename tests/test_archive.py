@@ -0,0 +1,38 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from archive import load_schedules, save_schedules  # noqa: E402
+from schedule import schedule_modules  # noqa: E402
+
+M = [1, 2, 3]
+ADS = dict.fromkeys(M, 5)
+DES = dict.fromkeys(M, 8)
+COOL = dict.fromkeys(M, 4)
+
+
+def _results():
+    return [schedule_modules(ADS, DES, COOL, [(1, 2)], multi_cycle=True, fixed_makespan=h, engine="greedy",
+                             render=False, return_result=True) for h in (40, 80)]
+
+
+def test_saved_schedules_round_trip(tmp_path):
+    results = _results()
+    assert save_schedules(str(tmp_path), results) == 2
+    with load_schedules(str(tmp_path)) as lib:
+        assert len(lib) == 2
+        assert list(lib.totals()) == [r["total_done"] for r in results]
+        for n, original in enumerate(results):
+            loaded = lib.result(n)
+            assert list(loaded["intervals"]) == sorted(original["intervals"], key=lambda rec: rec[0])
+            assert loaded["per_module_done"] == original["per_module_done"]
+            assert loaded["problem"] == original["problem"]
+
+
+def test_results_held_past_close_stay_readable(tmp_path):
+    results = _results()
+    save_schedules(str(tmp_path), results)
+    with load_schedules(str(tmp_path)) as lib:
+        kept = lib.result(1)
+    assert list(kept["intervals"]) == sorted(results[1]["intervals"], key=lambda rec: rec[0])
@@ -0,0 +1,57 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip("ortools")
+
+from schedule import cpsat_cycles, schedule_modules  # noqa: E402
+from validate import validate  # noqa: E402
+
+M = [1, 2, 3, 4]
+ADS = dict.fromkeys(M, 5)
+DES = dict.fromkeys(M, 8)
+COOL = dict.fromkeys(M, 4)
+FANS = [(1, 2), (3, 4)]
+
+
+def test_auto_multi_cycle_picks_cpsat_and_finds_a_schedule():
+    result = schedule_modules(ADS, DES, COOL, FANS, multi_cycle=True, fixed_makespan=60, time_limit=5,
+                              render=False, return_result=True)
+    assert result["engine"] == "cpsat"
+    assert result["status"] in ("OPTIMAL", "FEASIBLE")
+    assert result["total_done"] == result["upper_bound"] == 12
+    assert validate(result) == []
+
+
+def test_cpsat_cycles_places_every_module():
+    _, per_module_done, total_done, status, _ = cpsat_cycles(M, ADS, DES, COOL, FANS, 120, 2, 2, time_limit=5)
+    assert status in ("OPTIMAL", "FEASIBLE")
+    assert all(per_module_done[i] >= 6 for i in M)
+    assert total_done >= 24
+
+
+def test_cpsat_repair_keeps_replanning_the_future():
+    from reschedule import reschedule
+
+    original = schedule_modules(ADS, DES, COOL, FANS, multi_cycle=True, fixed_makespan=120, engine="cpsat",
+                                time_limit=5, render=False, return_result=True)
+    repaired = reschedule(original, 20, {"type": "offline", "module": 3}, engine="cpsat", time_limit=5)
+    assert repaired["engine"] == "cpsat"
+    assert repaired["status"] in ("OPTIMAL", "FEASIBLE")
+    assert repaired["per_module_done"][3] <= 2
+    assert all(repaired["per_module_done"][i] >= 5 for i in (1, 2, 4))
+    assert validate(repaired) == []
+
+
+def test_cpsat_repair_under_lowered_capacity_stays_feasible():
+    from reschedule import reschedule
+
+    original = schedule_modules(ADS, DES, COOL, FANS, multi_cycle=True, fixed_makespan=120, engine="cpsat",
+                                time_limit=5, render=False, return_result=True)
+    repaired = reschedule(original, 20, {"type": "capacity", "resource": "desorption", "value": 1},
+                          engine="cpsat", time_limit=5)
+    assert repaired["status"] in ("OPTIMAL", "FEASIBLE")
+    assert repaired["total_done"] > repaired["frozen"] // 3
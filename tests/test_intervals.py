@@ -0,0 +1,39 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+np = pytest.importorskip("numpy")
+
+from intervals import IntervalTable  # noqa: E402
+
+RECORDS = [
+    (70000, 0, 0, 5, 'A'), (70000, 0, 5, 13, 'D'), (70000, 0, 13, 17, 'C'),
+    (2, None, 3, 9, 'A'), (2, None, 9, 12, 'D'), (2, None, 12, 20, 'C'),
+    (70000, 1, 5, 10, 'A'), (70000, 1, 13, 21, 'D'), (70000, 1, 21, 25, 'C'),
+]
+
+
+def test_to_numpy_round_trips_every_column():
+    table = IntervalTable.from_records(RECORDS)
+    cols = table.to_numpy()
+    assert all(len(col) == len(RECORDS) for col in cols.values())
+    rows = [(int(m), None if k < 0 else int(k), int(s), int(e), "ADC"[p])
+            for m, k, s, e, p in zip(cols["module"], cols["cycle"], cols["start"], cols["end"], cols["phase"])]
+    assert rows == list(table)
+    assert sorted(rows, key=lambda r: (r[0], r[2], r[4])) == sorted(RECORDS, key=lambda r: (r[0], r[2], r[4]))
+
+
+def test_phase_occupancy_and_utilisation_match_the_records():
+    table = IntervalTable.from_records(RECORDS)
+    horizon = 20
+    expected = [sum(1 for r in RECORDS if r[4] == 'D' and r[2] <= t < r[3]) for t in range(horizon)]
+    assert table.phase_occupancy('D', horizon).tolist() == expected
+
+    util = table.utilisation(horizon)
+    for i in (2, 70000):
+        for phase in "ADC":
+            busy = sum(max(0, min(e, horizon) - max(0, s)) for m, _, s, e, p in RECORDS if m == i and p == phase)
+            assert util[i][phase] == pytest.approx(busy / horizon)
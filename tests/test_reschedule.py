@@ -0,0 +1,35 @@
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from reschedule import reschedule  # noqa: E402
+from schedule import schedule_modules  # noqa: E402
+from validate import validate  # noqa: E402
+
+
+def test_duration_events_keep_started_cycles_within_capacity():
+    for seed in range(60):
+        rng = random.Random(seed)
+        M = list(range(1, rng.randint(3, 6) + 1))
+        ads = {i: rng.randint(2, 8) for i in M}
+        des = {i: rng.randint(3, 12) for i in M}
+        cool = {i: rng.randint(2, 10) for i in M}
+        horizon = rng.randint(60, 150)
+        original = schedule_modules(ads, des, cool, [(1, 2)], rng.randint(1, 3), rng.randint(1, 3), multi_cycle=True,
+                                    fixed_makespan=horizon, engine="greedy", render=False, return_result=True)
+        event = {"type": "duration", "module": rng.choice(M), "phase": rng.choice("DC"), "value": rng.randint(1, 15)}
+        repaired = reschedule(original, rng.randint(5, horizon - 10), event, engine="greedy")
+        assert validate(repaired) == [], (seed, event)
+
+
+def test_repair_result_carries_the_schedule_modules_fields():
+    M = [1, 2, 3]
+    original = schedule_modules(dict.fromkeys(M, 5), dict.fromkeys(M, 8), dict.fromkeys(M, 4), [(1, 2)],
+                                multi_cycle=True, fixed_makespan=90, engine="greedy", render=False, return_result=True)
+    repaired = reschedule(original, 30, {"type": "offline", "module": 2}, engine="greedy")
+    for key in ("reason", "stats", "violations", "cancelled", "upper_bound", "gap"):
+        assert key in repaired
+    assert repaired["total_done"] <= repaired["upper_bound"]
+    assert repaired["problem"]["offline"] == [2]
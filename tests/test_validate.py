@@ -0,0 +1,31 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from schedule import fallback_greedy  # noqa: E402
+from validate import validate_intervals  # noqa: E402
+
+ADS, DES, COOL = {1: 5}, {1: 10}, {1: 2}
+
+
+def test_overlapping_adsorptions_of_one_module_are_reported():
+    intervals = [
+        (1, 0, 0, 5, 'A'), (1, 0, 5, 15, 'D'), (1, 0, 15, 17, 'C'),
+        (1, 1, 3, 8, 'A'), (1, 1, 15, 25, 'D'), (1, 1, 25, 27, 'C'),
+    ]
+    violations = validate_intervals(intervals, ADS, DES, COOL, [], 2, 2)
+    assert [v["kind"] for v in violations] == ["module"]
+    assert (violations[0]["start"], violations[0]["end"]) == (3, 5)
+
+
+def test_tiled_cycles_are_valid():
+    # the next cycle adsorbs while the previous one desorbs and cools
+    intervals = [
+        (1, 0, 0, 5, 'A'), (1, 0, 5, 15, 'D'), (1, 0, 15, 17, 'C'),
+        (1, 1, 5, 10, 'A'), (1, 1, 10, 20, 'D'), (1, 1, 20, 22, 'C'),
+    ]
+    assert validate_intervals(intervals, ADS, DES, COOL, [], 2, 2) == []
+    intervals, _, total_done = fallback_greedy([1], ADS, DES, COOL, [], 40, 2, 2)
+    assert total_done > 0
+    assert validate_intervals(intervals, ADS, DES, COOL, [], 2, 2) == []
@@ -0,0 +1,154 @@
+"""
+Sweep-line validator for schedules produced by any engine.
+
+    from validate import validate
+    violations = validate(result)          # result dict from schedule_modules(return_result=True)
+
+Checks, in O(n log n) for n intervals:
+    order        every cycle runs A -> D -> C (D starts after A ends, C after D ends)
+    module       a module adsorbs for one cycle at a time. Multi-cycle schedules tile
+                 cycles (greedy and CP-SAT alike): the next adsorption may start as soon
+                 as the previous one ends, overlapping that cycle's desorption and cooling.
+    duration     each phase lasts the module's configured duration
+    fan          adsorptions on one fan group never overlap
+    desorption   at most desorption_capacity desorptions run at any time
+    cooling      at most cooling_capacity coolings run at any time
+
+Each violation is a dict with "kind", "message" and the module(s) and
+time span involved; an empty list means the schedule is valid.
+"""
+from schedule import fan_groups
+
+
+def _violation(kind, message, **where):
+    return dict(where, kind=kind, message=message)
+
+
+def _cycles(intervals, violations):
+    """
+    Group (i, k, s, e, phase) records into per-module cycles. Engines emit each cycle as
+    A, D, C records in that order (IntervalTable keeps that order within a module), so a
+    record out of that sequence is itself a violation.
+    """
+    cycles = []
+    open_cycle = {}
+    for rec in intervals:
+        i, s, e, phase = rec[0], rec[2], rec[3], rec[4]
+        cur = open_cycle.get(i)
+        if phase == "A":
+            if cur is not None:
+                violations.append(_violation("order", f"module {i}: cycle starting at {cur['A'][0]} is incomplete",
+                                             module=i, start=cur["A"][0]))
+            open_cycle[i] = {"A": (s, e)}
+        elif cur is not None and phase == ("D" if len(cur) == 1 else "C"):
+            cur[phase] = (s, e)
+            if phase == "C":
+                cycles.append((i, cur))
+                del open_cycle[i]
+        else:
+            violations.append(_violation("order", f"module {i}: {phase} phase at {s} outside an A->D->C cycle",
+                                         module=i, start=s, end=e))
+    for i, cur in open_cycle.items():
+        violations.append(_violation("order", f"module {i}: cycle starting at {cur['A'][0]} is incomplete",
+                                     module=i, start=cur["A"][0]))
+    return cycles
+
+
+def _capacity(kind, spans, cap, violations):
+    """Sweep +1/-1 events; report each maximal stretch where more than cap spans overlap."""
+    events = []
+    for s, e in spans:
+        if e > s:
+            events.append((s, 1))
+            events.append((e, -1))
+    events.sort()  # at equal times -1 sorts first: a span ending at t frees its slot for one starting at t
+    running = peak = 0
+    over_since = None
+    for n, (t, delta) in enumerate(events):
+        running += delta
+        if n + 1 < len(events) and events[n + 1][0] == t:
+            continue  # settle every event at time t before judging the level
+        if running > cap:
+            if over_since is None:
+                over_since, peak = t, running
+            peak = max(peak, running)
+        elif over_since is not None:
+            violations.append(_violation(kind, f"{peak} concurrent {kind} phases over [{over_since}, {t}) "
+                                         f"exceed capacity {cap}", start=over_since, end=t, count=peak,
+                                         capacity=cap))
+            over_since = None
+
+
+def validate_intervals(intervals, ads_dur, des_dur, cool_dur, fan_pairs, des_cap, cool_cap,
+                       check_durations=True):
+    """
+    Check plotted_intervals (a list of (i, k, s, e, phase) records or an IntervalTable)
+    against the problem. check_durations=False skips the per-phase duration check, e.g.
+    for repaired schedules whose past cycles ran with durations that have since changed.
+    Returns a list of violation dicts (empty if the schedule is valid).
+    """
+    violations = []
+    durations = {"A": ads_dur, "D": des_dur, "C": cool_dur}
+    cycles = _cycles(intervals, violations)
+
+    group_of, _ = fan_groups(sorted(ads_dur.keys()), fan_pairs)
+    by_group = {}
+    by_module = {}
+    des_spans = []
+    cool_spans = []
+    for i, cycle in cycles:
+        (sA, eA), (sD, eD), (sC, eC) = cycle["A"], cycle["D"], cycle["C"]
+        if sD < eA:
+            violations.append(_violation("order", f"module {i}: desorption starts at {sD} before adsorption "
+                                         f"ends at {eA}", module=i, start=sD, end=eA))
+        if sC < eD:
+            violations.append(_violation("order", f"module {i}: cooling starts at {sC} before desorption "
+                                         f"ends at {eD}", module=i, start=sC, end=eD))
+        if check_durations:
+            for phase, (s, e) in cycle.items():
+                want = durations[phase].get(i)
+                if want is not None and e - s != want:
+                    violations.append(_violation("duration", f"module {i}: {phase} phase [{s}, {e}) lasts "
+                                                 f"{e - s}, expected {want}", module=i, start=s, end=e))
+        by_group.setdefault(group_of.get(i, ("solo", i)), []).append((sA, eA, i))
+        by_module.setdefault(i, []).append((sA, eA))
+        des_spans.append((sD, eD))
+        cool_spans.append((sC, eC))
+
+    for i, spans in by_module.items():
+        spans.sort()
+        last_end = None
+        for s, e in spans:
+            if last_end is not None and s < last_end:
+                violations.append(_violation("module", f"module {i}: adsorption starting at {s} overlaps its "
+                                             f"previous adsorption, which runs until {last_end}", module=i,
+                                             start=s, end=min(e, last_end)))
+            last_end = e if last_end is None else max(last_end, e)
+
+    for windows in by_group.values():
+        windows.sort()
+        last_end, last_module = None, None
+        for s, e, i in windows:
+            if e <= s:
+                continue
+            # a module overlapping its own adsorption is reported as a "module" violation above
+            if last_end is not None and s < last_end and i != last_module:
+                violations.append(_violation("fan", f"modules {last_module} and {i} adsorb on a shared fan "
+                                             f"over [{s}, {min(e, last_end)})", modules=[last_module, i],
+                                             start=s, end=min(e, last_end)))
+            if last_end is None or e > last_end:
+                last_end, last_module = e, i
+
+    _capacity("desorption", des_spans, des_cap, violations)
+    _capacity("cooling", cool_spans, cool_cap, violations)
+    return violations
+
+
+def validate(result):
+    """Validate a schedule_modules() / reschedule() result dict against its own result["problem"]."""
+    problem = result["problem"]
+    return validate_intervals(
+        result["intervals"], problem["ads_dur"], problem["des_dur"], problem["cool_dur"], problem["fan_pairs"],
+        problem["desorption_capacity"], problem["cooling_capacity"],
+        check_durations=not result.get("frozen"),
+    )